@@ -70,8 +70,11 @@ def _fill_default(res_dict, attr_name, attr_spec):
                                        attr_spec.get('default'))
 
 
-def _dict_populate_defaults(attr_value, attr_spec):
-    # attr_value: dict
+def _compile_dict_defaults(attr_spec):
+    # Compile the default values to populate in a dict attribute into a
+    # tuple of (key, sub plan or None, key spec), or None if the attribute
+    # doesn't populate defaults; _populate_dict_defaults runs the plan.
+    #
     # attr_spec: an attribute specification dict e.g.
     # {
     #      ...
@@ -105,11 +108,9 @@ def _dict_populate_defaults(attr_value, attr_spec):
     #      }
     # }
     if not attr_spec.get(constants.DICT_POPULATE_DEFAULTS):
-        return attr_value
-
-    if attr_value is None or attr_value is constants.ATTR_NOT_SPECIFIED:
-        attr_value = {}
+        return None
 
+    plan = []
     for rule_type, rule_content in attr_spec['validate'].items():
         # we only recursively apply defaults for dict rules
         if 'dict' not in rule_type:
@@ -117,25 +118,84 @@ def _dict_populate_defaults(attr_value, attr_spec):
         for key, key_validator in rule_content.items():
             validator_name, _dummy, validator_params = (
                 validators._extract_validator(key_validator))
-
-            # recurse if required:
+            sub_plan = None
             if 'dict' in validator_name:
-                value = _dict_populate_defaults(
-                    attr_value.get(key),
-                    {
-                        constants.DICT_POPULATE_DEFAULTS: key_validator.get(
-                            constants.DICT_POPULATE_DEFAULTS),
-                        'validate': {validator_name: validator_params}
-                    }
-                )
-                if value is not None:
-                    attr_value[key] = value
-
-            _fill_default(attr_value, key, key_validator)
+                sub_plan = _compile_dict_defaults({
+                    constants.DICT_POPULATE_DEFAULTS: key_validator.get(
+                        constants.DICT_POPULATE_DEFAULTS),
+                    'validate': {validator_name: validator_params}
+                })
+            plan.append((key, sub_plan, key_validator))
+    return tuple(plan)
+
+
+def _populate_dict_defaults(attr_value, plan):
+    # Run a plan compiled by _compile_dict_defaults
+    if attr_value is None or attr_value is constants.ATTR_NOT_SPECIFIED:
+        attr_value = {}
+
+    for key, sub_plan, key_validator in plan:
+        if sub_plan is not None:
+            value = _populate_dict_defaults(attr_value.get(key), sub_plan)
+            if value is not None:
+                attr_value[key] = value
+        _fill_default(attr_value, key, key_validator)
 
     return attr_value
 
 
+def _compile_post_defaults(attributes):
+    return tuple((attr, attr_vals['allow_post'], 'default' in attr_vals,
+                  _compile_dict_defaults(attr_vals), attr_vals)
+                 for attr, attr_vals in attributes.items())
+
+
+def _compile_convert_values(attributes):
+    plan = []
+    for attr, attr_vals in attributes.items():
+        convert_to = attr_vals.get('convert_to')
+        rules = tuple(
+            (validators.get_validator(rule), params)
+            for rule, params in attr_vals.get('validate', {}).items())
+        if convert_to or rules:
+            plan.append((attr, convert_to, rules))
+    return tuple(plan)
+
+
+# The compiled plans of the attribute maps, keyed by the id of the map. An
+# entry holds the map, so that the id isn't reused, its number of attributes
+# and the generation of the validators the plans were built from. Adding
+# attributes to a map invalidates its plans, replacing attribute specs
+# requires a call to invalidate_plans().
+_plans = {}
+_MAX_PLANS = 1024
+
+
+def invalidate_plans():
+    """Drop the plans compiled from the attribute maps.
+
+    Must be called once attribute specs are replaced in, or removed from,
+    an attribute map; extending the maps with update_attributes_map() of
+    the extensions does it.
+    """
+    _plans.clear()
+
+
+def _get_plan(attributes, compile_plan):
+    entry = _plans.get(id(attributes))
+    if (entry is None or entry[0] is not attributes or
+            entry[1] != len(attributes) or
+            entry[2] != validators._generation):
+        if len(_plans) >= _MAX_PLANS:
+            _plans.clear()
+        entry = _plans[id(attributes)] = (attributes, len(attributes),
+                                          validators._generation, {})
+    plan = entry[3].get(compile_plan)
+    if plan is None:
+        plan = entry[3][compile_plan] = compile_plan(attributes)
+    return plan
+
+
 class AttributeInfo:
     """Provides operations on a resource's attribute map.
 
@@ -186,15 +246,15 @@ class AttributeInfo:
         :raises: exc_cls If check_allow_post is True and this instance of
             ResourceAttributes doesn't support POST.
         """
-        for attr, attr_vals in self.attributes.items():
-            if attr_vals['allow_post']:
-                value = _dict_populate_defaults(
-                    res_dict.get(attr, constants.ATTR_NOT_SPECIFIED),
-                    attr_vals)
-                if value is not constants.ATTR_NOT_SPECIFIED:
-                    res_dict[attr] = value
-
-                if 'default' not in attr_vals and attr not in res_dict:
+        plan = _get_plan(self.attributes, _compile_post_defaults)
+        for attr, allow_post, has_default, dict_plan, attr_vals in plan:
+            if allow_post:
+                if dict_plan is not None:
+                    res_dict[attr] = _populate_dict_defaults(
+                        res_dict.get(attr, constants.ATTR_NOT_SPECIFIED),
+                        dict_plan)
+
+                if not has_default and attr not in res_dict:
                     msg = _("Failed to parse request. Required "
                             "attribute '%s' not specified") % attr
                     raise exc_cls(msg)
@@ -216,26 +276,75 @@ class AttributeInfo:
         :raises: exc_cls If any errors occur converting/validating the
             res_dict.
         """
-        for attr, attr_vals in self.attributes.items():
-            if (attr not in res_dict or
-                    res_dict[attr] is constants.ATTR_NOT_SPECIFIED):
+        plan = _get_plan(self.attributes, _compile_convert_values)
+        for attr, convert_to, rules in plan:
+            value = res_dict.get(attr, constants.ATTR_NOT_SPECIFIED)
+            if value is constants.ATTR_NOT_SPECIFIED:
                 continue
             # Convert values if necessary
-            if 'convert_to' in attr_vals:
-                res_dict[attr] = attr_vals['convert_to'](res_dict[attr])
+            if convert_to:
+                value = res_dict[attr] = convert_to(value)
             # Check that configured values are correct
-            if 'validate' not in attr_vals:
-                continue
-            for rule in attr_vals['validate']:
-                validator = validators.get_validator(rule)
-                res = validator(res_dict[attr],
-                                attr_vals['validate'][rule])
+            for validator, params in rules:
+                res = validator(value, params)
                 if res:
                     msg_dict = {'attr': attr, 'reason': res}
                     msg = _("Invalid input for %(attr)s. "
                             "Reason: %(reason)s.") % msg_dict
                     raise exc_cls(msg)
 
+    def convert_values_bulk(
+            self, res_dicts,
+            exc_cls=lambda m: exceptions.InvalidInput(error_message=m)):
+        """Convert and validate attribute values for a bulk request.
+
+        Does what convert_values does for each of res_dicts, one attribute
+        at a time for all of them, so that the values of an attribute are
+        validated in a single pass where the validator supports it.
+
+        :param res_dicts: The list of resource attributes from the request.
+        :param exc_cls: Exception to be returned on error that must take
+            a single error message as it's only constructor arg.
+        :returns: A list with, for each of res_dicts, None if its values are
+            valid, otherwise the exception describing its first invalid
+            value. The values of an invalid item may be partly converted.
+        """
+        errors = [None] * len(res_dicts)
+        plan = _get_plan(self.attributes, _compile_convert_values)
+        for attr, convert_to, rules in plan:
+            indexes = []
+            values = []
+            for index, res_dict in enumerate(res_dicts):
+                value = res_dict.get(attr, constants.ATTR_NOT_SPECIFIED)
+                if (value is constants.ATTR_NOT_SPECIFIED or
+                        errors[index] is not None):
+                    continue
+                # Convert values if necessary
+                if convert_to:
+                    try:
+                        value = res_dict[attr] = convert_to(value)
+                    except exceptions.InvalidInput as e:
+                        errors[index] = e
+                        continue
+                indexes.append(index)
+                values.append(value)
+            # Check that configured values are correct
+            for validator, params in rules:
+                results = validators.validate_bulk(validator, values, params)
+                if not any(results):
+                    continue
+                for index, res in zip(indexes, results):
+                    if res:
+                        msg_dict = {'attr': attr, 'reason': res}
+                        msg = _("Invalid input for %(attr)s. "
+                                "Reason: %(reason)s.") % msg_dict
+                        errors[index] = exc_cls(msg)
+                values = [value for index, value in zip(indexes, values)
+                          if errors[index] is None]
+                indexes = [index for index in indexes
+                           if errors[index] is None]
+        return errors
+
     def _project_id_required(self, res_dict):
         return (('tenant_id' in self.attributes or
                  'project_id' in self.attributes) and
@@ -16,6 +16,7 @@
 import abc
 
 from neutron_lib._i18n import _
+from neutron_lib.api import attributes
 from neutron_lib import constants
 
 
@@ -140,6 +141,7 @@ class ExtensionDescriptor(metaclass=abc.ABCMeta):
         If an extension does not implement update_attributes_map, the method
         does nothing and just return.
         """
+        attributes.invalidate_plans()
         if not extension_attrs_map:
             return
 
@@ -14,6 +14,7 @@ import collections
 import functools
 import inspect
 import re
+import socket
 import unicodedata
 
 import netaddr
@@ -68,6 +69,7 @@ def _get_all_chars():
 # empty string is tested. Otherwise it is not deterministic which
 # constraint fails and this causes issues for some unittests when
 # PYTHONHASHSEED is set randomly.
+@functools.cache
 def _build_regex_range(ws=True, invert=False):
     """Build a range regex for a set of characters in utf8.
 
@@ -122,11 +124,25 @@ def _build_regex_range(ws=True, invert=False):
 
 valid_name_regex_base = '^(?![%s])[%s]*(?<![%s])$'
 
-valid_name_regex = (
-    valid_name_regex_base % (
-        _build_regex_range(ws=False, invert=True),
-        _build_regex_range(),
-        _build_regex_range(ws=False, invert=True)))
+
+@functools.cache
+def _get_valid_name_regex():
+    return re.compile(
+        valid_name_regex_base % (
+            _build_regex_range(ws=False, invert=True),
+            _build_regex_range(),
+            _build_regex_range(ws=False, invert=True)))
+
+
+def __getattr__(name):
+    # valid_name_regex is built on first use rather than at import: its
+    # ranges come from a scan of the whole BMP, which every process
+    # importing the validators would otherwise pay for. They are not
+    # shipped precomputed because they depend on the unicodedata version
+    # of the running interpreter.
+    if name == 'valid_name_regex':
+        return _get_valid_name_regex().pattern
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _verify_dict_keys(expected_keys, target_dict, strict=True):
@@ -161,6 +177,33 @@ def _verify_dict_keys(expected_keys, target_dict, strict=True):
         return _(msg) % msg_data
 
 
+# Tags of the keys of unhashable items, which can't be equal to any item.
+_DICT_KEY = object()
+_LIST_KEY = object()
+_TUPLE_KEY = object()
+
+
+def _get_key(item):
+    # Return a hashable key that is equal for equal items. Dicts, lists,
+    # tuples and sets are supported; TypeError is raised for the other
+    # unhashable items.
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        pass
+    item_type = type(item)
+    if item_type is dict:
+        return _DICT_KEY, frozenset((key, _get_key(value))
+                                    for key, value in item.items())
+    if item_type is list or item_type is tuple:
+        return (_LIST_KEY if item_type is list else _TUPLE_KEY,
+                tuple(_get_key(value) for value in item))
+    if item_type is set:
+        return frozenset(item)
+    raise TypeError(item)
+
+
 def _collect_duplicates(data_list):
     """Collects duplicate items from a list and returns them.
 
@@ -169,13 +212,30 @@ def _collect_duplicates(data_list):
     :returns: A list of items that are duplicates in data_list. If no
         duplicates are found, the returned list is empty.
     """
-    seen = []
+    try:
+        keys = [_get_key(datum) for datum in data_list]
+    except TypeError:
+        # Items of other unhashable types, such as dict subclasses, can only
+        # be compared one by one.
+        seen = []
+        dups = []
+        for datum in data_list:
+            if datum in seen and datum not in dups:
+                dups.append(datum)
+                continue
+            seen.append(datum)
+        return dups
+
+    seen = set()
+    dup_keys = set()
     dups = []
-    for datum in data_list:
-        if datum in seen and datum not in dups:
-            dups.append(datum)
+    for datum, key in zip(data_list, keys):
+        if key in seen:
+            if key not in dup_keys:
+                dup_keys.add(key)
+                dups.append(datum)
             continue
-        seen.append(datum)
+        seen.add(key)
     return dups
 
 
@@ -389,7 +449,7 @@ def validate_name_string(data, max_len=None):
         return msg
 
     try:
-        if re.search(valid_name_regex, data):
+        if _get_valid_name_regex().search(data):
             return
     except TypeError:
         # The name must be string type. If data isn't string type,
@@ -575,6 +635,52 @@ def validate_mac_address_or_none(data, valid_values=None):
         return validate_mac_address(data, valid_values)
 
 
+_IPV4_REGEX = (r'(?:(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}'
+               r'(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])')
+_IPV4_ADDRESS_REGEX = re.compile(_IPV4_REGEX)
+_IPV4_CIDR_REGEX = re.compile(f'({_IPV4_REGEX})/(3[0-2]|[12]?[0-9])')
+_IPV6_CIDR_REGEX = re.compile(
+    r'([0-9A-Fa-f:.]+)/(12[0-8]|1[01][0-9]|[1-9]?[0-9])')
+
+
+def _parse_ipv6(data):
+    # netaddr parses IPv6 addresses with inet_pton too.
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, data), 'big')
+    except (OSError, ValueError):
+        return None
+
+
+def _is_valid_ip_address(data):
+    # Fast path of validate_ip_address: True for dotted quads without
+    # leading zeros and for IPv6 addresses. False doesn't mean invalid, only
+    # that the netaddr based validation has to decide.
+    if type(data) is not str:
+        return False
+    if ':' in data:
+        return _parse_ipv6(data) is not None
+    return _IPV4_ADDRESS_REGEX.fullmatch(data) is not None
+
+
+def _parse_cidr(data):
+    # Fast path of validate_subnet and validate_route_cidr: the version,
+    # address value and prefix length of an IPv4 CIDR without leading zeros
+    # or of an IPv6 CIDR. None doesn't mean invalid, only that the netaddr
+    # based validation has to decide.
+    if type(data) is not str:
+        return None
+    match = _IPV4_CIDR_REGEX.fullmatch(data)
+    if match:
+        return (4, int.from_bytes(socket.inet_aton(match[1]), 'big'),
+                int(match[2]))
+    match = _IPV6_CIDR_REGEX.fullmatch(data)
+    if match:
+        value = _parse_ipv6(match[1])
+        if value is not None:
+            return 6, value, int(match[2])
+    return None
+
+
 def validate_ip_address(data, valid_values=None):
     """Validate data is an IP address.
 
@@ -583,6 +689,8 @@ def validate_ip_address(data, valid_values=None):
     :returns: None if data is an IP address, otherwise a human readable
         message indicating why data isn't an IP address.
     """
+    if _is_valid_ip_address(data):
+        return
     msg = None
     msg_data = data
     try:
@@ -710,7 +818,7 @@ def validate_fixed_ips(data, valid_values=None):
         LOG.debug(msg, data)
         return _(msg) % data
 
-    ips = []
+    ips = set()
     for fixed_ip in data:
         if not isinstance(fixed_ip, dict):
             msg = "Invalid data format for fixed IP: '%s'"
@@ -720,7 +828,8 @@ def validate_fixed_ips(data, valid_values=None):
             # Ensure that duplicate entries are not set - just checking IP
             # suffices. Duplicate subnet_id's are legitimate.
             fixed_ip_address = fixed_ip['ip_address']
-            if fixed_ip_address in ips:
+            # Only valid addresses, which are strings, are added to ips
+            if isinstance(fixed_ip_address, str) and fixed_ip_address in ips:
                 msg = "Duplicate IP address '%s'"
                 LOG.debug(msg, fixed_ip_address)
                 msg = _(msg) % fixed_ip_address
@@ -728,7 +837,7 @@ def validate_fixed_ips(data, valid_values=None):
                 msg = validate_ip_address(fixed_ip_address)
             if msg:
                 return msg
-            ips.append(fixed_ip_address)
+            ips.add(fixed_ip_address)
         if 'subnet_id' in fixed_ip:
             msg = validate_uuid(fixed_ip['subnet_id'])
             if msg:
@@ -748,7 +857,7 @@ def validate_nameservers(data, valid_values=None):
         LOG.debug(msg, data)
         return _(msg) % data
 
-    hosts = []
+    hosts = set()
     for host in data:
         # This must be an IP address only
         msg = validate_ip_address(host)
@@ -761,7 +870,7 @@ def validate_nameservers(data, valid_values=None):
             msg = "Duplicate nameserver '%s'"
             LOG.debug(msg, host)
             return _(msg) % host
-        hosts.append(host)
+        hosts.add(host)
 
 
 def validate_hostroutes(data, valid_values=None):
@@ -780,7 +889,8 @@ def validate_hostroutes(data, valid_values=None):
         return _(msg) % data
 
     expected_keys = ['destination', 'nexthop']
-    hostroutes = []
+    # The (destination, nexthop) of the hostroutes, which have no other key
+    hostroutes = set()
     for hostroute in data:
         msg = _verify_dict_keys(expected_keys, hostroute)
         if msg:
@@ -791,11 +901,12 @@ def validate_hostroutes(data, valid_values=None):
         msg = validate_ip_address(hostroute['nexthop'])
         if msg:
             return msg
-        if hostroute in hostroutes:
+        key = (hostroute['destination'], hostroute['nexthop'])
+        if key in hostroutes:
             msg = "Duplicate hostroute '%s'"
             LOG.debug(msg, hostroute)
             return _(msg) % hostroute
-        hostroutes.append(hostroute)
+        hostroutes.add(key)
 
 
 def validate_ip_address_or_none(data, valid_values=None):
@@ -834,6 +945,8 @@ def validate_subnet(data, valid_values=None):
     :returns: None if data is valid IP network address. Otherwise a human
         readable message as to why data is invalid.
     """
+    if _parse_cidr(data):
+        return
     try:
         net = netaddr.IPNetwork(validate_no_whitespace(data))
         # TODO(ihar): remove this explicit check when the minimal version of
@@ -854,6 +967,15 @@ def validate_route_cidr(data, valid_values=None):
     :returns: None if data is valid CIDR. Otherwise a human
               readable message as to why data is invalid.
     """
+    cidr = _parse_cidr(data)
+    if cidr:
+        version, value, prefixlen = cidr
+        host_bits = (32 if version == 4 else 128) - prefixlen
+        # Loopback CIDRs are left to netaddr, which reports them.
+        loopback = (value >> 24 == 127 and prefixlen >= 8 if version == 4
+                    else value == 1)
+        if not value & ((1 << host_bits) - 1) and not loopback:
+            return
     msg = "'%s' is not a valid CIDR"
     try:
         net = netaddr.IPNetwork(validate_no_whitespace(data))
@@ -1367,62 +1489,159 @@ def validate_list_of_dict_or_nodata(data, valid_values=None):
                                        **valid_values)
 
 
+# Incremented each time the registered validators change, so that the users
+# keeping looked up validators know to look them up again.
+_generation = 0
+
+
+def _changes_registry(method):
+    @functools.wraps(method)
+    def change(self, *args, **kwargs):
+        global _generation
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _generation += 1
+    return change
+
+
+class _ValidatorRegistry(dict):
+    """The registered validators, by validation type.
+
+    Any change to the registry, including direct assignments and
+    mock.patch.dict, increments _generation.
+    """
+
+    __setitem__ = _changes_registry(dict.__setitem__)
+    __delitem__ = _changes_registry(dict.__delitem__)
+    __ior__ = _changes_registry(dict.__ior__)
+    clear = _changes_registry(dict.clear)
+    pop = _changes_registry(dict.pop)
+    popitem = _changes_registry(dict.popitem)
+    setdefault = _changes_registry(dict.setdefault)
+    update = _changes_registry(dict.update)
+
+
 # Dictionary that maintains a list of validation functions
-validators = {'type:dict': validate_dict,
-              'type:dict_or_none': validate_dict_or_none,
-              'type:dict_or_empty': validate_dict_or_empty,
-              'type:dict_or_nodata': validate_dict_or_nodata,
-              'type:ethertype': validate_ethertype,
-              'type:fixed_ips': validate_fixed_ips,
-              'type:hostroutes': validate_hostroutes,
-              'type:ip_address': validate_ip_address,
-              'type:ip_address_or_none': validate_ip_address_or_none,
-              'type:ip_or_subnet_or_none': validate_ip_or_subnet_or_none,
-              'type:ip_pools': validate_ip_pools,
-              'type:list_of_regex_or_none': validate_list_of_regex_or_none,
-              'type:mac_address': validate_mac_address,
-              'type:mac_address_or_none': validate_mac_address_or_none,
-              'type:nameservers': validate_nameservers,
-              'type:non_negative': validate_non_negative,
-              'type:port_range': validate_port_range_or_none,
-              'type:range': validate_range,
-              'type:range_or_none': validate_range_or_none,
-              'type:regex': validate_regex,
-              'type:regex_or_none': validate_regex_or_none,
-              'type:string': validate_string,
-              'type:string_or_none': validate_string_or_none,
-              'type:not_empty_string': validate_not_empty_string,
-              'type:not_empty_string_or_none':
-              validate_not_empty_string_or_none,
-              'type:oneline_not_empty_string':
-              validate_oneline_not_empty_string,
-              'type:oneline_not_empty_string_or_none':
-              validate_oneline_not_empty_string_or_none,
-              'type:name_string': validate_name_string,
-              'type:name_string_or_none': validate_name_string_or_none,
-              'type:not_empty_name_string': validate_not_empty_name_string,
-              'type:subnet': validate_subnet,
-              'type:subnet_list': validate_subnet_list,
-              'type:subnet_or_none': validate_subnet_or_none,
-              'type:subnetpool_id': validate_subnetpool_id,
-              'type:subnetpool_id_or_none': validate_subnetpool_id_or_none,
-              'type:subports': validate_subports,
-              'type:uuid': validate_uuid,
-              'type:uuid_or_none': validate_uuid_or_none,
-              'type:uuid_list': validate_uuid_list,
-              'type:uuid_list_non_empty': validate_uuid_list_non_empty,
-              'type:values': validate_values,
-              'type:boolean': validate_boolean,
-              'type:integer': validate_integer,
-              'type:list_of_unique_strings': validate_list_of_unique_strings,
-              'type:list_of_any_key_specs_or_none':
-                  validate_any_key_specs_or_none,
-              'type:service_plugin_type': validate_service_plugin_type,
-              'type:list_of_subnets_or_none': validate_subnet_list_or_none,
-              'type:list_of_subnet_service_types':
-                  validate_subnet_service_types,
-              'type:list_of_dict_or_nodata': validate_list_of_dict_or_nodata,
-              }
+validators = _ValidatorRegistry({
+    'type:dict': validate_dict,
+    'type:dict_or_none': validate_dict_or_none,
+    'type:dict_or_empty': validate_dict_or_empty,
+    'type:dict_or_nodata': validate_dict_or_nodata,
+    'type:ethertype': validate_ethertype,
+    'type:fixed_ips': validate_fixed_ips,
+    'type:hostroutes': validate_hostroutes,
+    'type:ip_address': validate_ip_address,
+    'type:ip_address_or_none': validate_ip_address_or_none,
+    'type:ip_or_subnet_or_none': validate_ip_or_subnet_or_none,
+    'type:ip_pools': validate_ip_pools,
+    'type:list_of_regex_or_none': validate_list_of_regex_or_none,
+    'type:mac_address': validate_mac_address,
+    'type:mac_address_or_none': validate_mac_address_or_none,
+    'type:nameservers': validate_nameservers,
+    'type:non_negative': validate_non_negative,
+    'type:port_range': validate_port_range_or_none,
+    'type:range': validate_range,
+    'type:range_or_none': validate_range_or_none,
+    'type:regex': validate_regex,
+    'type:regex_or_none': validate_regex_or_none,
+    'type:string': validate_string,
+    'type:string_or_none': validate_string_or_none,
+    'type:not_empty_string': validate_not_empty_string,
+    'type:not_empty_string_or_none':
+        validate_not_empty_string_or_none,
+    'type:oneline_not_empty_string':
+        validate_oneline_not_empty_string,
+    'type:oneline_not_empty_string_or_none':
+        validate_oneline_not_empty_string_or_none,
+    'type:name_string': validate_name_string,
+    'type:name_string_or_none': validate_name_string_or_none,
+    'type:not_empty_name_string': validate_not_empty_name_string,
+    'type:subnet': validate_subnet,
+    'type:subnet_list': validate_subnet_list,
+    'type:subnet_or_none': validate_subnet_or_none,
+    'type:subnetpool_id': validate_subnetpool_id,
+    'type:subnetpool_id_or_none': validate_subnetpool_id_or_none,
+    'type:subports': validate_subports,
+    'type:uuid': validate_uuid,
+    'type:uuid_or_none': validate_uuid_or_none,
+    'type:uuid_list': validate_uuid_list,
+    'type:uuid_list_non_empty': validate_uuid_list_non_empty,
+    'type:values': validate_values,
+    'type:boolean': validate_boolean,
+    'type:integer': validate_integer,
+    'type:list_of_unique_strings': validate_list_of_unique_strings,
+    'type:list_of_any_key_specs_or_none':
+        validate_any_key_specs_or_none,
+    'type:service_plugin_type': validate_service_plugin_type,
+    'type:list_of_subnets_or_none': validate_subnet_list_or_none,
+    'type:list_of_subnet_service_types':
+        validate_subnet_service_types,
+    'type:list_of_dict_or_nodata': validate_list_of_dict_or_nodata,
+})
+
+
+_UUID_REGEX = re.compile('[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-'
+                         '[0-9a-f]{12}')
+_MAC_REGEX = re.compile(f"{_HEX_ELEM}{{2}}(:{_HEX_ELEM}{{2}}){{5}}")
+_INVALID_MAC_ADDRESSES = frozenset(
+    mac.lower() for mac in constants.INVALID_MAC_ADDRESSES)
+
+
+def _validate_uuid_bulk(values, valid_values=None):
+    # The canonical form is checked with a regex, the other forms
+    # is_uuid_like accepts go through validate_uuid.
+    match = _UUID_REGEX.fullmatch
+    return [None if type(value) is str and match(value)
+            else validate_uuid(value)
+            for value in values]
+
+
+def _validate_mac_address_bulk(values, valid_values=None):
+    # The colon separated form is checked with a regex, the other forms
+    # netaddr accepts go through validate_mac_address.
+    match = _MAC_REGEX.fullmatch
+    return [None if (type(value) is str and match(value) and
+                     value.lower() not in _INVALID_MAC_ADDRESSES)
+            else validate_mac_address(value)
+            for value in values]
+
+
+def _or_none_bulk(validate_bulk):
+    def validate(values, valid_values=None):
+        results = iter(validate_bulk(
+            [value for value in values if value is not None], valid_values))
+        return [None if value is None else next(results)
+                for value in values]
+    return validate
+
+
+# Validators checking a list of values in a single pass, keyed by the
+# validator they stand for. They return the list of the results of that
+# validator for the values.
+_bulk_validators = {
+    validate_mac_address: _validate_mac_address_bulk,
+    validate_mac_address_or_none: _or_none_bulk(_validate_mac_address_bulk),
+    validate_uuid: _validate_uuid_bulk,
+    validate_uuid_or_none: _or_none_bulk(_validate_uuid_bulk),
+}
+
+
+def validate_bulk(validator, values, valid_values=None):
+    """Validate several values with the same validator.
+
+    :param validator: The validator to run, as returned by get_validator.
+    :param values: The list of values to validate.
+    :param valid_values: The valid values or specs passed to the validator.
+    :returns: A list with, for each value, the result of the validator:
+        None if the value is valid, otherwise a human readable message
+        indicating why it isn't. Some validators check all the values in a
+        single pass.
+    """
+    validate_values_bulk = _bulk_validators.get(validator)
+    if validate_values_bulk is not None:
+        return validate_values_bulk(values, valid_values)
+    return [validator(value, valid_values) for value in values]
 
 
 def validate_ip_not_multicast(data, valid_values=None):
@@ -1541,3 +1760,87 @@ def add_validator(validation_type, validator):
             raise KeyError(msg)
         return
     validators[key] = validator
+
+
+# Memoization of the results of the validators on small immutable values.
+DEFAULT_MEMOIZE_MAXSIZE = 4096
+DEFAULT_MEMOIZE_MAX_DATA_LEN = 256
+_MEMOIZABLE_TYPES = frozenset((str, int, bool, type(None)))
+# The memoized validators, by validation type: (validator, memoized one)
+_memoized = {}
+
+
+def _memoize(validator, maxsize, max_data_len):
+    cached = functools.lru_cache(maxsize=maxsize, typed=True)(validator)
+
+    @functools.wraps(validator)
+    def validate(data, valid_values=None):
+        if (type(data) in _MEMOIZABLE_TYPES and
+                (type(data) is not str or len(data) <= max_data_len)):
+            # Checked before the call, so that a TypeError raised by the
+            # validator does not run it again.
+            try:
+                hash(valid_values)
+            except TypeError:
+                return validator(data, valid_values)
+            return cached(data, valid_values)
+        return validator(data, valid_values)
+
+    validate.cache_info = cached.cache_info
+    return validate
+
+
+def memoize_validator(validation_type, maxsize=DEFAULT_MEMOIZE_MAXSIZE,
+                      max_data_len=DEFAULT_MEMOIZE_MAX_DATA_LEN):
+    """Memoize the results of a registered validator.
+
+    The validator is replaced by one that keeps the results for the most
+    recently validated values, in a bounded LRU cache. Only scalar values,
+    and strings up to max_data_len characters, with hashable valid_values
+    are memoized; the other values are always validated. Only memoize pure
+    validators, for instance 'type:uuid', 'type:ip_address',
+    'type:subnet', 'type:mac_address' or 'type:regex': cached results are
+    returned without running, and logging, the validation again. Calling
+    the validator functions directly is not memoized.
+
+    :param validation_type: The type of the validator to memoize.
+    :param maxsize: The maximum number of results kept.
+    :param max_data_len: The maximum length of the memoized strings.
+    :raises KeyError: If no validator is registered for validation_type.
+    """
+    key = _to_validation_type(validation_type)
+    unmemoize_validator(key)
+    validator = validators[key]
+    _memoized[key] = (validator,
+                      _memoize(validator, maxsize, max_data_len))
+    validators[key] = _memoized[key][1]
+
+
+def unmemoize_validator(validation_type):
+    """Stop memoizing the results of a validator.
+
+    :param validation_type: The type of the validator.
+    """
+    key = _to_validation_type(validation_type)
+    validator, memoized = _memoized.pop(key, (None, None))
+    if validator is not None and validators.get(key) is memoized:
+        validators[key] = validator
+
+
+def get_memoize_stats():
+    """Return the statistics of the memoized validators.
+
+    :returns: A dict with, for each memoized validation type, a dict of the
+        'hits', 'misses', 'hit_rate', 'maxsize' and 'currsize' of its
+        cache.
+    """
+    stats = {}
+    for key, (_validator, memoized) in list(_memoized.items()):
+        info = memoized.cache_info()
+        calls = info.hits + info.misses
+        stats[key] = {'hits': info.hits,
+                      'misses': info.misses,
+                      'hit_rate': info.hits / calls if calls else 0.0,
+                      'maxsize': info.maxsize,
+                      'currsize': info.currsize}
+    return stats
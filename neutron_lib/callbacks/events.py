@@ -47,6 +47,7 @@ ABORT_DELETE = 'abort_delete'
 ABORT = 'abort_'
 BEFORE = 'before_'
 PRECOMMIT = 'precommit_'
+AFTER = 'after_'
 
 OVS_RESTARTED = 'ovs_restarted'
 
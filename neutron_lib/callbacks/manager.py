@@ -11,6 +11,10 @@
 #    under the License.
 
 import collections
+from concurrent import futures
+import itertools
+import threading
+import time
 
 from oslo_log import log as logging
 from oslo_utils import reflection
@@ -19,23 +23,42 @@ from neutron_lib.callbacks import events
 from neutron_lib.callbacks import exceptions
 from neutron_lib.callbacks import priority_group
 from neutron_lib.db import utils as db_utils
+from neutron_lib.utils import stats as stats_utils
 
 LOG = logging.getLogger(__name__)
 PriorityCallbacks = collections.namedtuple(
     'PriorityCallbacks', ['priority', 'pri_callbacks', 'cancellable'])
 Callback = collections.namedtuple(
-    'Callback', ['id', 'method', 'cancellable'])
+    'Callback',
+    ['id', 'method', 'cancellable', 'priority', 'deferred', 'batch'],
+    defaults=(priority_group.PRIORITY_DEFAULT, False, False))
+
+# Number of worker threads used to run deferred AFTER_* callbacks.
+DEFAULT_DEFERRED_WORKERS = 4
 
 
 class CallbacksManager:
     """A callback system that allows objects to cooperate in a loose manner."""
 
-    def __init__(self):
+    def __init__(self, deferred_workers=DEFAULT_DEFERRED_WORKERS):
+        """Create a new callbacks manager.
+
+        :param deferred_workers: the maximum number of threads used to run
+            the callbacks subscribed with ``deferred=True``. The pool is
+            only created the first time a deferred callback is executed.
+        """
+        self._deferred_workers = deferred_workers
+        self._executor = None
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        # LatencyStats instance when the callbacks are profiled, None
+        # otherwise.
+        self._stats = None
         self.clear()
 
     def subscribe(self, callback, resource, event,
                   priority=priority_group.PRIORITY_DEFAULT,
-                  cancellable=False):
+                  cancellable=False, deferred=False, batch=False):
         """Subscribe callback for a resource event.
 
         The same callback may register for more than one event.
@@ -48,11 +71,25 @@ class CallbacksManager:
         :param cancellable: if the callback is "cancellable", in case of
                             returning an exception, the callback manager will
                             raise a ``CallbackFailure`` exception.
+        :param deferred: if True and the callback is not cancellable, AFTER_*
+                         events are handed over to a bounded thread pool
+                         instead of being run on the publisher's thread. The
+                         callbacks of a priority group are run in order, in
+                         the same worker. The flag is ignored for any other
+                         kind of event.
+        :param batch: if True, ``publish_batch`` calls the callback once with
+                      the whole list of payloads, passed as the ``payloads``
+                      keyword argument, instead of once per payload.
+                      ``publish`` keeps calling it with a single ``payload``.
         """
-        LOG.debug("Subscribe: %(callback)s %(resource)s %(event)s "
-                  "%(priority)d, %(cancellable)s",
-                  {'callback': callback, 'resource': resource, 'event': event,
-                   'priority': priority, 'cancellable': cancellable})
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Subscribe: %(callback)s %(resource)s %(event)s "
+                      "%(priority)d, %(cancellable)s, %(deferred)s, "
+                      "%(batch)s",
+                      {'callback': callback, 'resource': resource,
+                       'event': event, 'priority': priority,
+                       'cancellable': cancellable, 'deferred': deferred,
+                       'batch': batch})
 
         callback_id = _get_id(callback)
         pri_callbacks_list = self._callbacks[resource].setdefault(event, [])
@@ -66,6 +103,13 @@ class CallbacksManager:
                 PriorityCallbacks(priority, pri_callbacks, cancellable))
             pri_callbacks_list.sort(key=lambda x: x.priority)
         pri_callbacks[callback_id] = callback
+        for flag, flagged in ((deferred, self._deferred),
+                              (batch, self._batch)):
+            if flag:
+                flagged.setdefault((resource, event), set()).add(callback_id)
+            elif (resource, event) in flagged:
+                flagged[(resource, event)].discard(callback_id)
+        self._rebuild_dispatch(resource, event)
 
         # We keep a copy of callbacks to speed the unsubscribe operation.
         if callback_id not in self._index:
@@ -91,16 +135,17 @@ class CallbacksManager:
                   {'callback': callback, 'resource': resource, 'event': event})
 
         callback_id = self._find(callback)
-        if not callback_id:
-            LOG.debug("Callback %s not found", callback_id)
+        if callback_id is None:
+            LOG.debug("Callback %s not found", callback)
             return
         if resource and event:
             self._del_callback(self._callbacks[resource][event], callback_id)
+            self._rebuild_dispatch(resource, event)
             self._index[callback_id][resource].discard(event)
             if not self._index[callback_id][resource]:
                 del self._index[callback_id][resource]
                 if not self._index[callback_id]:
-                    del self._index[callback_id]
+                    self._del_index(callback_id)
         else:
             value = f'{resource},{event}'
             raise exceptions.Invalid(element='resource,event', value=value)
@@ -112,14 +157,15 @@ class CallbacksManager:
         :param resource: the resource.
         """
         callback_id = self._find(callback)
-        if callback_id:
+        if callback_id is not None:
             if resource in self._index[callback_id]:
                 for event in self._index[callback_id][resource]:
                     self._del_callback(self._callbacks[resource][event],
                                        callback_id)
+                    self._rebuild_dispatch(resource, event)
                 del self._index[callback_id][resource]
                 if not self._index[callback_id]:
-                    del self._index[callback_id]
+                    self._del_index(callback_id)
 
     def unsubscribe_all(self, callback):
         """Unsubscribe callback for all events and all resources.
@@ -128,12 +174,30 @@ class CallbacksManager:
         :param callback: the callback.
         """
         callback_id = self._find(callback)
-        if callback_id:
+        if callback_id is not None:
             for resource, resource_events in self._index[callback_id].items():
                 for event in resource_events:
                     self._del_callback(self._callbacks[resource][event],
                                        callback_id)
-            del self._index[callback_id]
+                    self._rebuild_dispatch(resource, event)
+            self._del_index(callback_id)
+
+    def _del_index(self, callback_id):
+        del self._index[callback_id]
+        self._names.pop(callback_id, None)
+
+    def _get_name(self, callback_id):
+        """Return the name of a callback, as used in logs and errors.
+
+        Names are only built when needed and cached while the callback is
+        subscribed.
+        """
+        name = self._names.get(callback_id)
+        if name is None:
+            name = _get_name(callback_id)
+            if callback_id in self._index:
+                self._names[callback_id] = name
+        return name
 
     @db_utils.reraise_as_retryrequest
     def publish(self, resource, event, trigger, payload=None):
@@ -167,40 +231,261 @@ class CallbacksManager:
                     any(error.is_cancellable for error in errors)):
                 raise exceptions.CallbackFailure(errors=errors)
 
+    @db_utils.reraise_as_retryrequest
+    def publish_batch(self, resource, event, trigger, payloads):
+        """Notify all subscribed callback(s) with a list of payloads.
+
+        This is the bulk counterpart of ``publish``: callbacks subscribed with
+        ``batch=True`` are called once with all the payloads, the others are
+        called once per payload. Callbacks are still run in priority order,
+        each one being handed every payload before the next one is called.
+        The error handling is the same as ``publish``; for BEFORE_* events the
+        ABORT_* event is published for the whole batch.
+
+        :param resource: The resource for the event.
+        :param event: The event.
+        :param trigger: The trigger. A reference to the sender of the event.
+        :param payloads: The list of event objects to send to subscribers.
+            Each one must be an instance of EventPayload.
+        :raises neutron_lib.callbacks.exceptions.Invalid: if
+            a payload object is not an instance of EventPayload.
+        :raises CallbackFailure: if the underlying callback has errors.
+        """
+        payloads = list(payloads)
+        for payload in payloads:
+            if not isinstance(payload, events.EventPayload):
+                raise exceptions.Invalid(element='event payload',
+                                         value=type(payload))
+        if not payloads:
+            return
+        errors = self._notify_batch_loop(resource, event, trigger, payloads)
+        if errors:
+            if event.startswith(events.BEFORE):
+                abort_event = event.replace(
+                    events.BEFORE, events.ABORT)
+                self._notify_batch_loop(resource, abort_event, trigger,
+                                        payloads)
+
+                raise exceptions.CallbackFailure(errors=errors)
+
+            if (event.startswith(events.PRECOMMIT) or
+                    any(error.is_cancellable for error in errors)):
+                raise exceptions.CallbackFailure(errors=errors)
+
+    def enable_stats(self, buckets=stats_utils.DEFAULT_LATENCY_BUCKETS):
+        """Start profiling the callbacks.
+
+        Every callback execution is then timed and accounted per
+        (resource, event) and callback name. Enabling the statistics again
+        drops the samples recorded so far.
+
+        :param buckets: the upper bounds, in seconds, of the latency
+            histogram buckets.
+        """
+        self._stats = stats_utils.LatencyStats(buckets=buckets)
+
+    def disable_stats(self):
+        """Stop profiling the callbacks and drop the recorded samples."""
+        self._stats = None
+
+    def get_stats(self):
+        """Return a snapshot of the callbacks statistics.
+
+        :returns: a dict ``{(resource, event): {callback_name: {'count': int,
+            'total_time': float, 'histogram': [(upper_bound, count), ...]}}}``,
+            empty if the statistics are disabled.
+        """
+        return self._stats.snapshot() if self._stats is not None else {}
+
+    def dump_stats(self, limit=None):
+        """Log the callbacks sorted by decreasing cumulative time.
+
+        :param limit: the maximum number of callbacks to log, or None for all.
+        """
+        if self._stats is None:
+            LOG.info("Callback statistics are disabled")
+            return
+        for (resource, event), callback_name, count, total_time in (
+                self._stats.top(limit)):
+            LOG.info("Callback %(callback)s for %(resource)s, %(event)s: "
+                     "%(count)d calls, %(total).6fs total, %(avg).6fs avg",
+                     {'callback': callback_name, 'resource': resource,
+                      'event': event, 'count': count, 'total': total_time,
+                      'avg': total_time / count})
+
     def clear(self):
-        """Brings the manager to a clean slate."""
+        """Brings the manager to a clean slate.
+
+        The deferred callbacks already submitted are waited for and the
+        thread pool is shut down; a new one is created when needed.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         self._callbacks = collections.defaultdict(dict)
         self._index = collections.defaultdict(dict)
+        # Lazily built callback names, see _get_name.
+        self._names = {}
+        # The ids of the callbacks subscribed with deferred=True and
+        # batch=True respectively, per (resource, event).
+        self._deferred = {}
+        self._batch = {}
+        # Frozen, priority ordered tuple of Callback per (resource, event),
+        # rebuilt only when the subscriptions for that pair change.
+        self._dispatch = {}
+
+    def _rebuild_dispatch(self, resource, event):
+        """Refresh the dispatch tuple and the flags for a resource event."""
+        key = (resource, event)
+        deferred = self._deferred.get(key, ())
+        batch = self._batch.get(key, ())
+        callbacks = tuple(
+            Callback(cb_id, cb_method, pri_callbacks.cancellable,
+                     pri_callbacks.priority, cb_id in deferred,
+                     cb_id in batch)
+            for pri_callbacks in self._callbacks[resource].get(event, [])
+            for cb_id, cb_method in pri_callbacks.pri_callbacks.items())
+        # Drop the flags of the callbacks no longer subscribed.
+        subscribed = {c.id for c in callbacks}
+        for flagged in (self._deferred, self._batch):
+            callback_ids = flagged.get(key)
+            if callback_ids is not None:
+                callback_ids &= subscribed
+                if not callback_ids:
+                    del flagged[key]
+        if callbacks:
+            self._dispatch[key] = callbacks
+        else:
+            self._dispatch.pop(key, None)
 
     def _notify_loop(self, resource, event, trigger, payload):
         """The notification loop."""
+        return self._notify(resource, event, trigger, payload=payload)
+
+    def _notify_batch_loop(self, resource, event, trigger, payloads):
+        """The notification loop for a list of payloads."""
+        return self._notify(resource, event, trigger, payloads=payloads)
+
+    def _notify(self, resource, event, trigger, payload=None, payloads=None):
+        """Run the callbacks for an event.
+
+        :param payload: the payload of a ``publish`` call.
+        :param payloads: the payloads of a ``publish_batch`` call.
+        """
+        errors = []
+        callbacks = self._dispatch.get((resource, event), ())
+        # NOTE: isEnabledFor is cached by the logging module, and the cache is
+        # reset whenever a log level changes; this keeps the publish path free
+        # of any debug-only work when debug logging is disabled.
+        if LOG.isEnabledFor(logging.DEBUG):
+            if payloads is None:
+                resource_id = getattr(payload, "resource_id", None)
+            else:
+                resource_id = [getattr(p, "resource_id", None)
+                               for p in payloads]
+            LOG.debug("Publish callbacks %s for %s (%s), %s",
+                      [self._get_name(c.id) for c in callbacks], resource,
+                      resource_id, event)
+        deferred = None
+        for callback in callbacks:
+            if (callback.deferred and not callback.cancellable and
+                    event.startswith(events.AFTER)):
+                if deferred is None:
+                    deferred = []
+                deferred.append(callback)
+                continue
+            self._invoke(callback, resource, event, trigger, errors,
+                         payload=payload, payloads=payloads)
+        if deferred:
+            for _priority, group in itertools.groupby(
+                    deferred, key=lambda c: c.priority):
+                self._submit_deferred(tuple(group), resource, event,
+                                      trigger, payload=payload,
+                                      payloads=payloads)
+        return errors
+
+    def _invoke(self, callback, resource, event, trigger, errors,
+                payload=None, payloads=None):
+        """Run a callback for a single payload or for a list of payloads."""
+        if payloads is None:
+            self._call(callback, resource, event, trigger, errors,
+                       payload=payload)
+        elif callback.batch:
+            self._call(callback, resource, event, trigger, errors,
+                       payloads=payloads)
+        else:
+            for item in payloads:
+                self._call(callback, resource, event, trigger, errors,
+                           payload=item)
+
+    def _call(self, callback, resource, event, trigger, errors, **kwargs):
+        """Run a single callback, appending its failure to errors."""
+        stats = self._stats
+        start = time.perf_counter() if stats is not None else None
+        try:
+            callback.method(resource, event, trigger, **kwargs)
+        except Exception as e:
+            callback_name = self._get_name(callback.id)
+            if not (events.is_cancellable_event(event) or
+                    callback.cancellable):
+                LOG.exception("Error during notification for "
+                              "%(callback)s %(resource)s, %(event)s",
+                              {'callback': callback_name,
+                               'resource': resource, 'event': event})
+            else:
+                LOG.debug("Callback %(callback)s raised %(error)s",
+                          {'callback': callback_name, 'error': e})
+            errors.append(exceptions.NotificationError(
+                callback_name, e, cancellable=callback.cancellable))
+        finally:
+            if start is not None:
+                stats.record((resource, event), self._get_name(callback.id),
+                             time.perf_counter() - start)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = futures.ThreadPoolExecutor(
+                max_workers=self._deferred_workers,
+                thread_name_prefix='callbacks-deferred')
+        return self._executor
+
+    def _submit_deferred(self, callbacks, resource, event, trigger,
+                         **kwargs):
+        """Hand over a priority group of callbacks to the thread pool."""
+        future = self._get_executor().submit(
+            self._run_deferred, callbacks, resource, event, trigger,
+            **kwargs)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard_pending)
+
+    def _discard_pending(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+
+    def _run_deferred(self, callbacks, resource, event, trigger,
+                      payload=None, payloads=None):
+        """Run a priority group of deferred callbacks in order.
+
+        The errors cannot be reported back to the publisher, which has already
+        returned; they are collected and logged (by ``_call``) instead.
+        """
         errors = []
-        callbacks = []
-        for pri_callbacks in self._callbacks[resource].get(event, []):
-            for cb_id, cb_method in pri_callbacks.pri_callbacks.items():
-                cb = Callback(cb_id, cb_method, pri_callbacks.cancellable)
-                callbacks.append(cb)
-        resource_id = getattr(payload, "resource_id", None)
-        LOG.debug("Publish callbacks %s for %s (%s), %s",
-                  [c.id for c in callbacks], resource, resource_id, event)
-        # TODO(armax): consider using a GreenPile
         for callback in callbacks:
-            try:
-                callback.method(resource, event, trigger, payload=payload)
-            except Exception as e:
-                if not (events.is_cancellable_event(event) or
-                        callback.cancellable):
-                    LOG.exception("Error during notification for "
-                                  "%(callback)s %(resource)s, %(event)s",
-                                  {'callback': callback.id,
-                                   'resource': resource, 'event': event})
-                else:
-                    LOG.debug("Callback %(callback)s raised %(error)s",
-                              {'callback': callback.id, 'error': e})
-                errors.append(exceptions.NotificationError(
-                    callback.id, e, cancellable=callback.cancellable))
+            self._invoke(callback, resource, event, trigger, errors,
+                         payload=payload, payloads=payloads)
         return errors
 
+    def wait_deferred(self, timeout=None):
+        """Wait for the deferred callbacks submitted so far to complete.
+
+        :param timeout: the maximum number of seconds to wait, or None to
+            wait without time limit.
+        """
+        with self._pending_lock:
+            pending = list(self._pending)
+        futures.wait(pending, timeout=timeout)
+
     def _find(self, callback):
         """Return the callback_id if found, None otherwise."""
         callback_id = _get_id(callback)
@@ -208,10 +493,19 @@ class CallbacksManager:
 
 
 def _get_id(callback):
-    """Return a unique identifier for the callback."""
-    # TODO(armax): consider using something other than names
-    # https://www.python.org/dev/peps/pep-3155/, but this
-    # might be okay for now.
+    """Return a unique identifier for the callback.
+
+    The callback is its own identifier: functions compare by identity and
+    bound methods by the identity of their instance and function, so the
+    transient bound method objects built on every attribute access map to
+    the same subscription. This avoids building a name on every subscribe,
+    unsubscribe and lookup; see _get_name for the human readable form.
+    """
+    return callback
+
+
+def _get_name(callback):
+    """Return a human readable, unique name for the callback."""
     parts = (reflection.get_callable_name(callback),
              str(hash(callback)))
     return '-'.join(parts)
@@ -16,6 +16,7 @@ import inspect
 from neutron_lib._i18n import _
 from neutron_lib.callbacks import manager
 from neutron_lib.callbacks import priority_group
+from neutron_lib.utils import stats as stats_utils
 
 
 # TODO(armax): consider adding locking
@@ -35,9 +36,10 @@ def _get_callback_manager():
 
 def subscribe(callback, resource, event,
               priority=priority_group.PRIORITY_DEFAULT,
-              cancellable=False):
+              cancellable=False, deferred=False, batch=False):
     _get_callback_manager().subscribe(callback, resource, event, priority,
-                                      cancellable)
+                                      cancellable, deferred=deferred,
+                                      batch=batch)
 
 
 def unsubscribe(callback, resource, event):
@@ -56,10 +58,34 @@ def publish(resource, event, trigger, payload=None):
     _get_callback_manager().publish(resource, event, trigger, payload=payload)
 
 
+def publish_batch(resource, event, trigger, payloads):
+    _get_callback_manager().publish_batch(resource, event, trigger, payloads)
+
+
+def wait_deferred(timeout=None):
+    _get_callback_manager().wait_deferred(timeout=timeout)
+
+
 def clear():
     _get_callback_manager().clear()
 
 
+def enable_stats(buckets=stats_utils.DEFAULT_LATENCY_BUCKETS):
+    _get_callback_manager().enable_stats(buckets=buckets)
+
+
+def disable_stats():
+    _get_callback_manager().disable_stats()
+
+
+def get_stats():
+    return _get_callback_manager().get_stats()
+
+
+def dump_stats(limit=None):
+    _get_callback_manager().dump_stats(limit=limit)
+
+
 def receives(resource, events, priority=priority_group.PRIORITY_DEFAULT):
     """Use to decorate methods on classes before initialization.
 
@@ -10,9 +10,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import contextlib
 import copy
 import functools
+import time
 import weakref
 
 from oslo_concurrency import lockutils
@@ -22,6 +24,7 @@ from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import enginefacade
 from oslo_log import log as logging
 from oslo_utils import excutils
+from oslo_utils import reflection
 from osprofiler import opts as profiler_opts
 import osprofiler.sqlalchemy
 from pecan import util as p_util
@@ -35,9 +38,12 @@ from neutron_lib._i18n import _
 from neutron_lib.db import model_base
 from neutron_lib import exceptions
 from neutron_lib.objects import exceptions as obj_exc
+from neutron_lib.utils import stats as stats_utils
 
 
 MAX_RETRIES = 20
+# Upper bounds, in seconds, of the retry backoff histogram buckets.
+RETRY_BACKOFF_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0)
 LOG = logging.getLogger(__name__)
 _synchronized = lockutils.synchronized_with_prefix("neutron-")
 _CTX_MANAGER = None
@@ -140,9 +146,43 @@ def _tag_retriables_as_unretriable(f):
     return wrapped
 
 
+# Types of the immutable values shared rather than copied by _copy_lds.
+_IMMUTABLE_TYPES = frozenset((type(None), bool, int, float, complex, str,
+                              bytes))
+
+
+def _copy_lds(item):
+    """Deepcopy a tree of lists/dicts/sets.
+
+    The built-in containers are rebuilt directly and the immutable values
+    shared, which is several times faster than copy.deepcopy on request
+    bodies; any other object is handed to copy.deepcopy. Unlike
+    copy.deepcopy, a container referenced twice is copied twice.
+    """
+    cls = type(item)
+    if cls is dict:
+        return {k: v if type(v) in _IMMUTABLE_TYPES else _copy_lds(v)
+                for k, v in item.items()}
+    if cls is list:
+        return [v if type(v) in _IMMUTABLE_TYPES else _copy_lds(v)
+                for v in item]
+    if cls is set:
+        return {v if type(v) in _IMMUTABLE_TYPES else _copy_lds(v)
+                for v in item}
+    if cls in _IMMUTABLE_TYPES:
+        return item
+    return copy.deepcopy(item)
+
+
 def _copy_if_lds(item):
     """Deepcopy lists/dicts/sets, leave everything else alone."""
-    return copy.deepcopy(item) if isinstance(item, list | dict | set) else item
+    if not isinstance(item, list | dict | set):
+        return item
+    try:
+        return _copy_lds(item)
+    except RecursionError:
+        # self referencing containers, which copy.deepcopy keeps track of
+        return copy.deepcopy(item)
 
 
 _retry_db_errors = oslo_db_api.wrap_db_retry(
@@ -154,6 +194,35 @@ _retry_db_errors = oslo_db_api.wrap_db_retry(
 )
 
 
+# Retries of the functions decorated with retry_db_errors, see
+# get_retry_stats.
+_retry_stats = stats_utils.LatencyStats(buckets=RETRY_BACKOFF_BUCKETS)
+
+
+def get_retry_stats():
+    """Return a snapshot of the DB retries statistics.
+
+    The retries are counted per decorated function and type of the retried
+    exception, along with the time spent backing off before them.
+
+    :returns: a dict ``{function_name: {exception_type: {'count': int,
+        'total_time': float, 'histogram': [(upper_bound, count), ...]}}}``
+        where total_time and the histogram are about the backoff times.
+    """
+    return _retry_stats.snapshot()
+
+
+def reset_retry_stats():
+    """Drop the DB retries statistics recorded so far."""
+    _retry_stats.reset()
+
+
+def _get_retry_reason(e):
+    if isinstance(e, db_exc.RetryRequest):
+        e = e.inner_exc
+    return type(e).__name__
+
+
 def retry_db_errors(f):
     """Nesting-safe retry decorator with auto-arg-copy and logging.
 
@@ -165,13 +234,22 @@ def retry_db_errors(f):
     with a flag so is_retriable will no longer recognize them as retriable.
     This prevents multiple applications of this decorator (and/or the one
     below) from retrying the same exception.
+
+    The retries are accounted in the statistics returned by
+    get_retry_stats.
     """
+    f_name = reflection.get_callable_name(f)
 
-    @_tag_retriables_as_unretriable
     @_retry_db_errors
     @functools.wraps(f)
-    def wrapped(*args, **kwargs):
+    def retrying(*args, **kwargs):
         context_reference = None
+        # the (reason, time) of the last failure, kept across the attempts
+        retry_state = kwargs.pop('_retry_state')
+        if retry_state:
+            reason, failed_at = retry_state
+            _retry_stats.record(f_name, reason,
+                                time.monotonic() - failed_at)
         try:
             # copy mutable args and kwargs to make retries safe. this doesn't
             # prevent mutations of complex objects like the context or 'self'
@@ -183,8 +261,14 @@ def retry_db_errors(f):
             with excutils.save_and_reraise_exception():
                 if is_retriable(e):
                     LOG.debug("Retry wrapper got retriable exception: %s", e)
+                    retry_state[:] = (_get_retry_reason(e), time.monotonic())
                     if context_reference and context_reference.session:
                         context_reference.session.rollback()
+
+    @_tag_retriables_as_unretriable
+    @functools.wraps(f)
+    def wrapped(*args, **kwargs):
+        return retrying(*args, _retry_state=[], **kwargs)
     return wrapped
 
 
@@ -294,6 +378,45 @@ def _add_to_rel_load_list(session, flush_context=None):
         session.new)
 
 
+# The keys of the relationships loaded when a new object is committed, per
+# mapper. See _get_eager_relationships.
+_eager_relationships = {}
+
+# Maximum number of objects loaded by one query in _load_one_to_manys.
+_LOAD_RELS_CHUNK_SIZE = 500
+
+
+def _get_eager_relationships(mapper):
+    """Get the keys of the relationships loaded on commit for a mapper."""
+    keys = _eager_relationships.get(mapper)
+    if keys is None:
+        # we only want to automatically load relationships that would
+        # automatically load during a lookup operation
+        keys = _eager_relationships[mapper] = tuple(
+            rel.key for rel in mapper.relationships
+            if rel.lazy in ('joined', 'subquery', 'selectin'))
+    return keys
+
+
+def _load_relationships(session, mapper, states):
+    """Load the eager relationships of persistent objects of a mapper.
+
+    Querying the objects by primary key loads, with the eager loaders of
+    the mapper, the relationships that aren't loaded yet, for all of them
+    at once. The attributes already loaded are left alone.
+    """
+    pk = mapper.primary_key
+    for i in range(0, len(states), _LOAD_RELS_CHUNK_SIZE):
+        identities = [state.identity
+                      for state in states[i:i + _LOAD_RELS_CHUNK_SIZE]]
+        if len(pk) == 1:
+            criteria = pk[0].in_([identity[0] for identity in identities])
+        else:
+            criteria = sqlalchemy.tuple_(*pk).in_(identities)
+        session.scalars(
+            sqlalchemy.select(mapper).where(criteria)).unique().all()
+
+
 @event.listens_for(orm.session.Session, "before_commit")
 def _load_one_to_manys(session):
     # TODO(kevinbenton): we should be able to remove this after we
@@ -308,37 +431,42 @@ def _load_one_to_manys(session):
         # wait until final commit
         return
 
+    to_load = collections.defaultdict(list)
     for new_object in session.info.pop('_load_rels', []):
         if new_object not in session:
             # don't load detached objects because that brings them back into
             # session
             continue
         state = sqlalchemy.inspect(new_object)
-
-        # set up relationship loading so that we can call lazy
-        # loaders on the object even though the ".key" is not set up yet
-        # (normally happens by in after_flush_postexec, but we're trying
-        # to do this more succinctly).  in this context this is only
-        # setting a simple flag on the object's state.
-        session.enable_relationship_loading(new_object)
-
-        # look for eager relationships and do normal load.
-        # For relationships where the related object is also
-        # in the session these lazy loads will pull from the
-        # identity map and not emit SELECT.  Otherwise, we are still
-        # local in the transaction so a normal SELECT load will work fine.
-        for relationship_attr in state.mapper.relationships:
-            if relationship_attr.lazy not in ('joined', 'subquery',
-                                              'selectin'):
-                # we only want to automatically load relationships that would
-                # automatically load during a lookup operation
-                continue
-            if relationship_attr.key not in state.dict:
-                getattr(new_object, relationship_attr.key)
-                if relationship_attr.key not in state.dict:
-                    msg = (f"Relationship {relationship_attr.key} attributes "
-                           f"must be loaded in db object {state.dict}")
-                    raise AssertionError(msg)
+        keys = _get_eager_relationships(state.mapper)
+        if any(key not in state.dict for key in keys):
+            to_load[state.mapper].append(state)
+
+    for mapper, states in to_load.items():
+        # look for eager relationships and load them with one query per
+        # mapper (and per chunk of objects), rather than one lazy load per
+        # object and relationship. The objects in the session are pulled
+        # from the identity map, and we are still local in the transaction
+        # so a normal SELECT load will work fine.
+        _load_relationships(session, mapper,
+                            [state for state in states if state.key])
+
+        for state in states:
+            new_object = state.obj()
+            # set up relationship loading so that we can call lazy
+            # loaders on the object even though the ".key" is not set up yet
+            # (normally happens by in after_flush_postexec, but we're trying
+            # to do this more succinctly).  in this context this is only
+            # setting a simple flag on the object's state.
+            session.enable_relationship_loading(new_object)
+            for key in _get_eager_relationships(mapper):
+                if key not in state.dict:
+                    # not loaded by the query, load it on its own
+                    getattr(new_object, key)
+                    if key not in state.dict:
+                        msg = (f"Relationship {key} attributes "
+                               f"must be loaded in db object {state.dict}")
+                        raise AssertionError(msg)
 
 
 # Expire relationships when foreign key changes.
@@ -418,15 +546,34 @@ def _pending_callables(session, obj):
             _expire_for_fk_change(obj, *a)
 
 
+# The (relationship, foreign key attribute) pairs of the many-to-one
+# relationships of a mapper, per mapper. See _get_fk_expiry_plan.
+_fk_expiry_plans = {}
+
+
+def _get_fk_expiry_plan(mapper):
+    """Get the relationships to expire when the foreign keys change.
+
+    :param mapper: The mapper of the object whose foreign keys change.
+    :returns: A tuple of (relationship_prop, column_attr) pairs, one per
+        local column of the many-to-one relationships of the mapper. It is
+        built once per mapper, and again when relationships are added.
+    """
+    plan = _fk_expiry_plans.get(mapper)
+    if plan is None:
+        plan = _fk_expiry_plans[mapper] = tuple(
+            (prop, mapper.get_property_by_column(col).key)
+            for prop in mapper.relationships
+            if prop.direction is orm.interfaces.MANYTOONE
+            for col in prop.local_columns)
+    return plan
+
+
 @event.listens_for(orm.session.Session, "persistent_to_deleted")
 def _persistent_to_deleted(session, obj):
     """Expire relationships when an object w/ a foreign key becomes deleted"""
-    mapper = sqlalchemy.inspect(obj).mapper
-    for prop in mapper.relationships:
-        if prop.direction is orm.interfaces.MANYTOONE:
-            for col in prop.local_columns:
-                colkey = mapper.get_property_by_column(col).key
-                _expire_for_fk_change(obj, None, prop, colkey)
+    for prop, colkey in _get_fk_expiry_plan(sqlalchemy.inspect(obj).mapper):
+        _expire_for_fk_change(obj, None, prop, colkey)
 
 
 @event.listens_for(model_base.BASEV2, "attribute_instrument", propagate=True)
@@ -434,6 +581,9 @@ def _listen_for_changes(cls, key, inst):
     mapper = sqlalchemy.inspect(cls)
     if key not in mapper.relationships:
         return
+    # the relationships of the mappers are now different
+    _eager_relationships.clear()
+    _fk_expiry_plans.clear()
     prop = inst.property
 
     if prop.direction is orm.interfaces.MANYTOONE:
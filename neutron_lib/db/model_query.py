@@ -15,8 +15,15 @@
 NOTE: This module is a temporary shim until networking projects move to
       versioned objects at which point this module shouldn't be needed.
 """
+import collections
+import types
+
+import netaddr
 from oslo_db.sqlalchemy import utils as sa_utils
+import sqlalchemy as sa
+from sqlalchemy.orm import defaultload
 from sqlalchemy.orm import lazyload
+from sqlalchemy.orm import selectinload
 from sqlalchemy import sql, or_, and_
 
 from neutron_lib._i18n import _
@@ -65,6 +72,52 @@ _model_query_hooks = {
     # ...
 }
 
+# Incremented every time the registered hooks change; it is part of the
+# _query_templates keys so that a template built from outdated hooks is never
+# used again.
+_hooks_generation = 0
+
+# The context independent part of query_with_hooks, cached per
+# (model, field, scope, _hooks_generation). See _get_query_template.
+_query_templates = {}
+
+# Name of the bind parameter carrying the requester's project ID in the
+# cached scope filters.
+_PROJECT_ID_PARAM = 'model_query_project_id'
+
+# Number of rows fetched at once by iter_collection.
+DEFAULT_CHUNK_SIZE = 1000
+
+# Strategies used to filter the models with RBAC entries.
+# "join" does an outer join on the RBAC table and de-duplicates the rows
+# with a GROUP BY on the model ID; "exists" uses a correlated EXISTS subquery
+# on the RBAC table instead, which doesn't multiply the rows and thus needs
+# neither the join nor the GROUP BY.
+RBAC_STRATEGY_JOIN = 'join'
+RBAC_STRATEGY_EXISTS = 'exists'
+RBAC_STRATEGIES = (RBAC_STRATEGY_JOIN, RBAC_STRATEGY_EXISTS)
+
+_default_rbac_strategy = RBAC_STRATEGY_JOIN
+_model_rbac_strategies = {}
+
+# Query scopes, see _get_query_scope.
+_SCOPE_NONE = None
+_SCOPE_PROJECT = 'project'
+_SCOPE_SHARED = 'shared'
+_SCOPE_RBAC = 'rbac'
+_SCOPE_RBAC_EXISTS = 'rbac_exists'
+
+_QueryTemplate = collections.namedtuple(
+    '_QueryTemplate', ['entity', 'outerjoin', 'query_filter', 'group_by',
+                       'hooks'])
+
+
+def _hooks_changed():
+    """Invalidate the cached query templates."""
+    global _hooks_generation
+    _hooks_generation += 1
+    _query_templates.clear()
+
 
 def register_hook(model, name, query_hook, filter_hook,
                   result_filters=None, rbac_actions=None):
@@ -100,6 +153,36 @@ def register_hook(model, name, query_hook, filter_hook,
         'result_filters': result_filters,
         'rbac_actions': rbac_actions,
     }
+    _hooks_changed()
+
+
+def set_rbac_strategy(strategy, model=None):
+    """Select how the RBAC enabled models are filtered.
+
+    :param strategy: One of RBAC_STRATEGIES.
+    :param model: The DB Model the strategy applies to. If None, the strategy
+        becomes the default one for the models without a strategy of their
+        own.
+    :returns: None.
+    :raises InvalidInput: If the strategy is not known.
+    """
+    global _default_rbac_strategy
+    if strategy not in RBAC_STRATEGIES:
+        msg = _("'%s' is not a valid RBAC strategy") % strategy
+        raise n_exc.InvalidInput(error_message=msg)
+    if model is None:
+        _default_rbac_strategy = strategy
+    else:
+        _model_rbac_strategies[model] = strategy
+
+
+def get_rbac_strategy(model):
+    """Return the strategy used to filter a model on its RBAC entries.
+
+    :param model: The DB Model.
+    :returns: One of RBAC_STRATEGIES.
+    """
+    return _model_rbac_strategies.get(model, _default_rbac_strategy)
 
 
 def get_hooks(model):
@@ -131,53 +214,134 @@ def get_rbac_actions(model):
     )
 
 
-def query_with_hooks(context, model, field=None, lazy_fields=None):
-    """Query with hooks using the said context and model.
+def _get_query_scope(context, model):
+    """Return the kind of project scoping applied to a model query."""
+    if not db_utils.model_query_scope_is_project(context, model):
+        return _SCOPE_NONE
+    if hasattr(model, 'rbac_entries'):
+        if get_rbac_strategy(model) == RBAC_STRATEGY_EXISTS:
+            return _SCOPE_RBAC_EXISTS
+        return _SCOPE_RBAC
+    if hasattr(model, 'shared'):
+        return _SCOPE_SHARED
+    return _SCOPE_PROJECT
+
+
+def _build_scope_filter(model, scope, project_id):
+    """Build the filter restricting a model query to a project.
 
-    :param context: The context to use for the DB session.
     :param model: The model to query.
-    :param field: The column.
-    :param lazy_fields: list of fields for lazy loading
-    :returns: The query with hooks applied to it.
+    :param scope: The query scope, as returned by _get_query_scope.
+    :param project_id: The project ID, either a value or a bind parameter.
+    :returns: A tuple (outerjoin, query_filter, group_by); outerjoin and
+        group_by are None when not needed.
     """
-    group_by = None
+    if scope == _SCOPE_RBAC:
+        rbac_model = model.rbac_entries.property.mapper.class_
+        query_filter = (
+            (model.project_id == project_id) |
+            (rbac_model.action.in_(get_rbac_actions(model)) &
+             ((rbac_model.target_project == project_id) |
+              (rbac_model.target_project == '*'))))
+        # This "group_by" clause will limit the number of registers
+        # returned by the query, avoiding the problem of the low SQL
+        # query cardinality when the RBAC registers are in the requested
+        # project ID.
+        return model.rbac_entries, query_filter, model.id
+    if scope == _SCOPE_RBAC_EXISTS:
+        rbac_model = model.rbac_entries.property.mapper.class_
+        query_filter = (
+            (model.project_id == project_id) |
+            model.rbac_entries.any(
+                rbac_model.action.in_(get_rbac_actions(model)) &
+                ((rbac_model.target_project == project_id) |
+                 (rbac_model.target_project == '*'))))
+        return None, query_filter, None
+    if scope == _SCOPE_SHARED:
+        return None, ((model.project_id == project_id) |
+                      (model.shared == sql.true())), None
+    if scope == _SCOPE_PROJECT:
+        return None, model.project_id == project_id, None
+    return None, None, None
+
+
+def _get_query_template(model, field, scope):
+    """Return the context independent part of a model query.
+
+    The template holds the queried entity, the scope filter built on the
+    _PROJECT_ID_PARAM bind parameter and the hooks of the model. It is
+    built once per (model, field, scope) and rebuilt when the hooks change.
+    The hooks are kept as registered, weak references included, so that
+    caching them doesn't extend the life of their owners.
+    """
+    key = (model, field, scope, _hooks_generation)
+    template = _query_templates.get(key)
+    if template is not None:
+        return template
     if field:
         if hasattr(model, field):
-            field = getattr(model, field)
+            entity = getattr(model, field)
         else:
             msg = _("'%s' is not supported as field") % field
             raise n_exc.InvalidInput(error_message=msg)
-        query = context.session.query(field)
     else:
-        query = context.session.query(model)
+        entity = model
+    outerjoin, query_filter, group_by = _build_scope_filter(
+        model, scope, sql.bindparam(_PROJECT_ID_PARAM))
+    hooks = tuple((hook.get('query'), hook.get('filter'))
+                  for hook in get_hooks(model)
+                  if hook.get('query') or hook.get('filter'))
+    template = _QueryTemplate(entity, outerjoin, query_filter, group_by,
+                              hooks)
+    _query_templates[key] = template
+    return template
+
+
+def query_with_hooks(context, model, field=None, lazy_fields=None):
+    """Query with hooks using the said context and model.
+
+    :param context: The context to use for the DB session.
+    :param model: The model to query.
+    :param field: The column.
+    :param lazy_fields: list of fields for lazy loading
+    :returns: The query with hooks applied to it.
+    """
+    query, group_by = _query_with_hooks(context, model, field=field)
+    if group_by is not None:
+        query = query.group_by(group_by)
+
+    if lazy_fields:
+        for lfield in lazy_fields:
+            query = query.options(lazyload(lfield))
+    return query
+
+
+def _query_with_hooks(context, model, field=None):
+    """Build a query with hooks, without its GROUP BY clause.
+
+    :returns: A tuple (query, group_by) where group_by is the column the
+        rows of the query must be grouped by to get each object once, or
+        None.
+    """
+    scope = _get_query_scope(context, model)
+    template = _get_query_template(model, field, scope)
+    query = context.session.query(template.entity)
     # define basic filter condition for model query
-    query_filter = None
-    if db_utils.model_query_scope_is_project(context, model):
-        if hasattr(model, 'rbac_entries'):
-            query = query.outerjoin(model.rbac_entries)
-            rbac_model = model.rbac_entries.property.mapper.class_
-            query_filter = (
-                (model.project_id == context.project_id) |
-                (rbac_model.action.in_(get_rbac_actions(model)) &
-                 ((rbac_model.target_project == context.project_id) |
-                  (rbac_model.target_project == '*'))))
-            # This "group_by" clause will limit the number of registers
-            # returned by the query, avoiding the problem of the low SQL
-            # query cardinality when the RBAC registers are in the requested
-            # project ID.
-            group_by = model.id
-        elif hasattr(model, 'shared'):
-            query_filter = ((model.project_id == context.project_id) |
-                            (model.shared == sql.true()))
-        else:
-            query_filter = model.project_id == context.project_id
+    query_filter = template.query_filter
+    if query_filter is not None and context.project_id is None:
+        # NOTE: "project_id == None" must be rendered as "IS NULL", which a
+        # bind parameter can't do.
+        _outerjoin, query_filter, _group_by = _build_scope_filter(
+            model, scope, None)
+    if template.outerjoin is not None:
+        query = query.outerjoin(template.outerjoin)
     # Execute query hooks registered from mixins and plugins
-    for hook in get_hooks(model):
-        query_hook = helpers.resolve_ref(hook.get('query'))
+    for query_hook, filter_hook in template.hooks:
+        query_hook = helpers.resolve_ref(query_hook)
         if query_hook:
             query = query_hook(context, model, query)
 
-        filter_hook = helpers.resolve_ref(hook.get('filter'))
+        filter_hook = helpers.resolve_ref(filter_hook)
         if filter_hook:
             query_filter = filter_hook(context, model, query_filter)
 
@@ -186,13 +350,9 @@ def query_with_hooks(context, model, field=None, lazy_fields=None):
     if query_filter is not None:
         query = query.filter(query_filter)
 
-    if group_by:
-        query = query.group_by(group_by)
-
-    if lazy_fields:
-        for lfield in lazy_fields:
-            query = query.options(lazyload(lfield))
-    return query
+    if template.query_filter is not None:
+        query = query.params({_PROJECT_ID_PARAM: context.project_id})
+    return query, template.group_by
 
 
 def get_by_id(context, model, object_id, lazy_fields=None):
@@ -209,6 +369,53 @@ def get_by_id(context, model, object_id, lazy_fields=None):
     return query.filter(model.id == object_id).one()
 
 
+def _apply_shared_filter(query, model, value, context=None):
+    """Translate a filter on shared into a query on the RBAC entries.
+
+    :param query: The query to apply the filter to.
+    :param model: The model for the query; it must have RBAC entries.
+    :param value: The filter values; only the first one is considered.
+    :param context: The context to use for the DB session.
+    :returns: The query with the filter applied to it.
+    """
+    rbac = model.rbac_entries.property.mapper.class_
+    matches = [rbac.target_project == '*']
+    if context:
+        matches.append(rbac.target_project == context.project_id)
+    # any 'access_as_shared' records that match the
+    # wildcard or requesting project
+    is_shared = and_(rbac.action == constants.ACCESS_SHARED,
+                     or_(*matches))
+    if get_rbac_strategy(model) == RBAC_STRATEGY_EXISTS:
+        is_shared = model.rbac_entries.any(is_shared)
+        if not value[0]:
+            is_shared = ~is_shared
+    elif not value[0]:
+        # NOTE(kevinbenton): we need to find objects that don't
+        # have an entry that matches the criteria above so
+        # we use a subquery to exclude them.
+        # We can't just filter the inverse of the query above
+        # because that will still give us a network shared to
+        # our project (or wildcard) if it's shared to another
+        # project.
+        # This is the column joining the table to rbac via
+        # the object_id. We can't just use model.id because
+        # subnets join on network.id so we have to inspect the
+        # relationship.
+        join_cols = model.rbac_entries.property.local_columns
+        oid_col = list(join_cols)[0]
+        is_shared = ~oid_col.in_(
+            query.session.query(rbac.object_id).filter(is_shared)
+        )
+    elif (not context or
+          not db_utils.model_query_scope_is_project(context, model)):
+        # we only want to join if we aren't using the subquery
+        # and if we aren't already joined because this is a
+        # scoped query
+        query = query.outerjoin(model.rbac_entries)
+    return query.filter(is_shared)
+
+
 def apply_filters(query, model, filters, context=None):
     """Apply filters to a query.
 
@@ -254,41 +461,7 @@ def apply_filters(query, model, filters, context=None):
                     except NotImplementedError:
                         pass
             elif key == 'shared' and hasattr(model, 'rbac_entries'):
-                # translate a filter on shared into a query against the
-                # object's rbac entries
-                rbac = model.rbac_entries.property.mapper.class_
-                matches = [rbac.target_project == '*']
-                if context:
-                    matches.append(rbac.target_project == context.project_id)
-                # any 'access_as_shared' records that match the
-                # wildcard or requesting project
-                is_shared = and_(rbac.action == constants.ACCESS_SHARED,
-                                 or_(*matches))
-                if not value[0]:
-                    # NOTE(kevinbenton): we need to find objects that don't
-                    # have an entry that matches the criteria above so
-                    # we use a subquery to exclude them.
-                    # We can't just filter the inverse of the query above
-                    # because that will still give us a network shared to
-                    # our project (or wildcard) if it's shared to another
-                    # project.
-                    # This is the column joining the table to rbac via
-                    # the object_id. We can't just use model.id because
-                    # subnets join on network.id so we have to inspect the
-                    # relationship.
-                    join_cols = model.rbac_entries.property.local_columns
-                    oid_col = list(join_cols)[0]
-                    is_shared = ~oid_col.in_(
-                        query.session.query(rbac.object_id).filter(is_shared)
-                    )
-                elif (not context or
-                      not db_utils.model_query_scope_is_project(
-                          context, model)):
-                    # we only want to join if we aren't using the subquery
-                    # and if we aren't already joined because this is a
-                    # scoped query
-                    query = query.outerjoin(model.rbac_entries)
-                query = query.filter(is_shared)
+                query = _apply_shared_filter(query, model, value, context)
         for hook in get_hooks(model):
             result_filter = helpers.resolve_ref(
                 hook.get('result_filters', None))
@@ -297,9 +470,69 @@ def apply_filters(query, model, filters, context=None):
     return query
 
 
+def _get_sort_keys_and_dirs(model, sorts, page_reverse=False):
+    sort_keys = db_utils.get_and_validate_sort_keys(sorts, model)
+    sort_dirs = db_utils.get_sort_dirs(sorts, page_reverse)
+    # we always want deterministic results for sorted queries
+    # so add unique keys to limit queries when present.
+    # (http://docs.sqlalchemy.org/en/latest/orm/
+    #  loading_relationships.html#subqueryload-ordering)
+    # (http://docs.sqlalchemy.org/en/latest/faq/
+    #  ormconfiguration.html#faq-subqueryload-limit-sort)
+    for k in _unique_keys(model):
+        if k not in sort_keys:
+            sort_keys.append(k)
+            sort_dirs.append('asc')
+    return sort_keys, sort_dirs
+
+
+def get_pagination_sort_keys(model, sorts):
+    """Get the keys a sorted collection query is ordered by.
+
+    Besides the requested sort keys, these include the unique keys of the
+    model added to get a deterministic order. A pagination marker given by
+    its values must provide a value for each of them.
+
+    :param model: The model to use.
+    :param sorts: The sort keys to use.
+    :returns: The list of sort keys.
+    """
+    return _get_sort_keys_and_dirs(model, sorts)[0]
+
+
+def _get_keyset_marker(model, sort_keys, marker_values):
+    """Build a marker object from the marker's sort key values."""
+    if isinstance(marker_values, str):
+        marker_values = db_utils.decode_pagination_cursor(marker_values)
+    missing = [k for k in sort_keys if k not in marker_values]
+    if missing:
+        msg = _("The pagination marker has no value for the sort keys: "
+                "%s") % ', '.join(missing)
+        raise n_exc.BadRequest(resource=model.__tablename__, msg=msg)
+    columns = sa.inspect(model).columns
+    return types.SimpleNamespace(**{
+        key: _to_marker_value(model, columns.get(key), value)
+        for key, value in marker_values.items()})
+
+
+def _to_marker_value(model, column, value):
+    # A cursor holds the values of the netaddr column types as strings,
+    # which these types don't accept as bind parameters.
+    netaddr_type = getattr(getattr(column, 'type', None), 'netaddr_type',
+                           None)
+    if netaddr_type is None or not isinstance(value, str):
+        return value
+    try:
+        return netaddr_type(value)
+    except (netaddr.AddrFormatError, TypeError, ValueError) as e:
+        msg = _("'%(value)s' is not a valid pagination marker value for "
+                "%(key)s") % {'value': value, 'key': column.key}
+        raise n_exc.BadRequest(resource=model.__tablename__, msg=msg) from e
+
+
 def get_collection_query(context, model, filters=None, sorts=None, limit=None,
                          marker_obj=None, page_reverse=False, field=None,
-                         lazy_fields=None):
+                         lazy_fields=None, marker_values=None):
     """Get a collection query.
 
     :param context: The context to use for the DB session.
@@ -312,24 +545,23 @@ def get_collection_query(context, model, filters=None, sorts=None, limit=None,
     :param field: Column, in string format, from the "model"; the query will
                   return only this parameter instead of the full model columns.
     :param lazy_fields: list of fields for lazy loading
+    :param marker_values: The marker, given by its sort key values instead of
+                          marker_obj so that it doesn't have to be loaded
+                          first: either a dict with a value for each key
+                          returned by get_pagination_sort_keys, or a cursor
+                          built by db_utils.encode_pagination_cursor.
     :returns: A paginated query for the said model.
+    :raises BadRequest: If marker_values lacks a sort key or is not a valid
+        cursor.
     """
     collection = query_with_hooks(context, model, field=field,
                                   lazy_fields=lazy_fields)
     collection = apply_filters(collection, model, filters, context)
     if sorts:
-        sort_keys = db_utils.get_and_validate_sort_keys(sorts, model)
-        sort_dirs = db_utils.get_sort_dirs(sorts, page_reverse)
-        # we always want deterministic results for sorted queries
-        # so add unique keys to limit queries when present.
-        # (http://docs.sqlalchemy.org/en/latest/orm/
-        #  loading_relationships.html#subqueryload-ordering)
-        # (http://docs.sqlalchemy.org/en/latest/faq/
-        #  ormconfiguration.html#faq-subqueryload-limit-sort)
-        for k in _unique_keys(model):
-            if k not in sort_keys:
-                sort_keys.append(k)
-                sort_dirs.append('asc')
+        sort_keys, sort_dirs = _get_sort_keys_and_dirs(model, sorts,
+                                                       page_reverse)
+        if marker_values is not None:
+            marker_obj = _get_keyset_marker(model, sort_keys, marker_values)
         collection = sa_utils.paginate_query(collection, model, limit,
                                              marker=marker_obj,
                                              sort_keys=sort_keys,
@@ -348,7 +580,7 @@ def _unique_keys(model):
 def get_collection(context, model, dict_func,
                    filters=None, fields=None,
                    sorts=None, limit=None, marker_obj=None,
-                   page_reverse=False, lazy_fields=None):
+                   page_reverse=False, lazy_fields=None, marker_values=None):
     """Get a collection for a said model.
 
     :param context: The context to use for the DB session.
@@ -361,13 +593,16 @@ def get_collection(context, model, dict_func,
     :param marker_obj: The marker object if applicable.
     :param page_reverse: If reverse paging should be used.
     :param lazy_fields: list of fields for lazy loading
+    :param marker_values: The marker sort key values or cursor, see
+                          get_collection_query.
     :returns: A list of dicts where each dict is an object in the collection.
     """
     query = get_collection_query(context, model,
                                  filters=filters, sorts=sorts,
                                  limit=limit, marker_obj=marker_obj,
                                  page_reverse=page_reverse,
-                                 lazy_fields=lazy_fields)
+                                 lazy_fields=lazy_fields,
+                                 marker_values=marker_values)
     items = [
         attributes.populate_project_info(
             dict_func(c, fields) if dict_func else c)
@@ -378,12 +613,106 @@ def get_collection(context, model, dict_func,
     return items
 
 
+def _get_streaming_options(model, lazy_fields=None):
+    # yield_per can't be used with the eager loads that need the whole
+    # result set (subquery loads, scalar or not, and joined loads of
+    # collections), including those of the related models loaded eagerly;
+    # load those relationships per chunk with a SELECT IN instead.
+    lazy_keys = {lfield.key for lfield in lazy_fields or ()}
+    return _get_streaming_loads(sa.inspect(model), skip_keys=lazy_keys)
+
+
+def _get_streaming_loads(mapper, skip_keys=(), path=frozenset()):
+    loads = []
+    path = path | {mapper}
+    for rel in mapper.relationships:
+        if rel.key in skip_keys:
+            continue
+        if rel.lazy == 'subquery' or rel.lazy == 'joined' and rel.uselist:
+            load = selectinload
+        elif rel.lazy in ('joined', 'selectin'):
+            # Kept as is, only the loads of the related model may change.
+            load = defaultload
+        else:
+            continue
+        # The related models already on the path are not walked again.
+        nested = (_get_streaming_loads(rel.mapper, path=path)
+                  if rel.mapper not in path else [])
+        if load is selectinload or nested:
+            loads.append(
+                load(getattr(mapper.class_, rel.key)).options(*nested))
+    return loads
+
+
+def iter_collection(context, model, dict_func,
+                    filters=None, fields=None,
+                    sorts=None, limit=None, marker_obj=None,
+                    page_reverse=False, lazy_fields=None, marker_values=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """Iterate over a collection for a said model.
+
+    Like get_collection, but the rows are fetched from the DB, and turned
+    into dicts, chunk_size at a time instead of all at once. The generator
+    keeps the DB cursor open until it is exhausted or closed, so it must be
+    consumed within the session transaction, if any.
+
+    :param context: The context to use for the DB session.
+    :param model: The model for the collection.
+    :param dict_func: The function used to build the collection dict.
+    :param filters: The filters to apply.
+    :param fields: The fields to collect.
+    :param sorts: The sort keys to use.
+    :param limit: The limit for the query if applicable.
+    :param marker_obj: The marker object if applicable.
+    :param page_reverse: If reverse paging should be used.
+    :param lazy_fields: list of fields for lazy loading
+    :param marker_values: The marker sort key values or cursor, see
+                          get_collection_query.
+    :param chunk_size: The number of rows fetched at once.
+    :returns: A generator of dicts where each dict is an object in the
+        collection.
+    """
+    if limit and page_reverse:
+        # The page is fetched in the reverse order, it has to be buffered
+        # anyway; it is bound by the limit.
+        yield from get_collection(context, model, dict_func,
+                                  filters=filters, fields=fields,
+                                  sorts=sorts, limit=limit,
+                                  marker_obj=marker_obj,
+                                  page_reverse=page_reverse,
+                                  lazy_fields=lazy_fields,
+                                  marker_values=marker_values)
+        return
+    query = get_collection_query(context, model,
+                                 filters=filters, sorts=sorts,
+                                 limit=limit, marker_obj=marker_obj,
+                                 page_reverse=page_reverse,
+                                 lazy_fields=lazy_fields,
+                                 marker_values=marker_values)
+    query = query.options(*_get_streaming_options(model, lazy_fields))
+    for c in query.yield_per(chunk_size):
+        yield attributes.populate_project_info(
+            dict_func(c, fields) if dict_func else c)
+
+
 def get_values(context, model, field, filters=None):
     query = query_with_hooks(context, model, field=field)
     query = apply_filters(query, model, filters, context)
     return [c[0] for c in query]
 
 
+def _is_distinct_or_grouped(query):
+    """Return whether the query may not be counted in place.
+
+    Query has no public accessor for its DISTINCT and GROUP BY clauses.
+    Should the attributes holding them go away, the query is assumed to be
+    distinct or grouped: it is then counted with Query.count(), which is
+    slower but always right.
+    """
+    return bool(getattr(query, '_distinct', True) or
+                getattr(query, '_group_by_clauses', True))
+
+
 def get_collection_count(context, model, filters=None, query_field=None):
     """Get the count for a specific collection.
 
@@ -395,5 +724,21 @@ def get_collection_count(context, model, filters=None, query_field=None):
                         model columns.
     :returns: The number of objects for said model with filters applied.
     """
-    return get_collection_query(context, model, filters=filters,
-                                field=query_field).count()
+    # Rather than wrapping the whole collection query in a subquery, as
+    # Query.count() does, count its rows in place; the objects the RBAC
+    # outer join returns several times are counted once with a DISTINCT
+    # instead of a GROUP BY. Selecting the count alone also skips the eager
+    # loads of the model. A primary key column is counted rather than "*"
+    # to keep the model in the FROM clause of unfiltered queries. Queries
+    # that hooks or filters made distinct or grouped keep Query.count().
+    query, group_by = _query_with_hooks(context, model, field=query_field)
+    query = apply_filters(query, model, filters, context)
+    if _is_distinct_or_grouped(query):
+        if group_by is not None:
+            query = query.group_by(group_by)
+        return query.count()
+    if group_by is not None:
+        count = sql.func.count(sql.distinct(group_by))
+    else:
+        count = sql.func.count(sa.inspect(model).primary_key[0])
+    return query.with_entities(count).order_by(None).scalar()
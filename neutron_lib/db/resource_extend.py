@@ -17,11 +17,14 @@ NOTE: This module shall not be used by external projects. It will be moved
 
 import collections
 import inspect
+import time
 
 from oslo_log import log as logging
+from oslo_utils import reflection
 from oslo_utils import timeutils
 
 from neutron_lib.utils import helpers
+from neutron_lib.utils import stats as stats_utils
 
 
 LOG = logging.getLogger(__name__)
@@ -40,6 +43,18 @@ _resource_extend_functions = {
 _DECORATED_EXTEND_METHODS = collections.defaultdict(list)
 _DECORATED_METHODS_REGISTERED = '_DECORATED_METHODS_REGISTERED'
 
+# Attribute flagging the functions extending a list of resources at once.
+_EXTENDS_BATCH = '_resource_extend_batch'
+
+# The functions of _resource_extend_functions along with their name and
+# kind, per resource. Built on first use and dropped when the functions of
+# the resource change, see _get_extenders.
+_Extender = collections.namedtuple('_Extender', ['ref', 'name', 'batch'])
+_extenders = {}
+
+# Per function timing of the extenders, see enable_stats.
+_stats = None
+
 
 def register_funcs(resource, funcs):
     """Add functions to extend a resource.
@@ -57,6 +72,9 @@ def register_funcs(resource, funcs):
             foo_res['bar'] = foo_db.bar_info  # example
             return foo_res
 
+    Functions decorated with @extends_batch take a list of
+    (resource dict, resource object) pairs instead.
+
     """
     funcs = [helpers.make_weak_ref(f) if callable(f) else f for f in funcs]
     existing_funcs = _resource_extend_functions.setdefault(resource, [])
@@ -64,6 +82,7 @@ def register_funcs(resource, funcs):
     for func in funcs:
         if func not in existing_funcs:
             existing_funcs.append(func)
+    _extenders.pop(resource, None)
 
 
 def get_funcs(resource):
@@ -81,6 +100,62 @@ def get_funcs(resource):
 # https://review.opendev.org/c/openstack/oslo.utils/+/991151
 
 
+def _is_batch(func):
+    return getattr(func, _EXTENDS_BATCH, False)
+
+
+def _funcs_changed():
+    """Drop the extenders built from the registered functions."""
+    _extenders.clear()
+
+
+def _get_extenders(resource):
+    """Get the extenders of a resource.
+
+    The name and kind of the functions are looked up once per change of
+    the functions registered for the resource rather than on every call.
+    The functions are kept as weak references, so that caching them
+    doesn't extend the life of their owners.
+    """
+    extenders = _extenders.get(resource)
+    if extenders is None:
+        extenders = []
+        for func in get_funcs(resource):
+            resolved_func = helpers.resolve_ref(func)
+            if resolved_func:
+                extenders.append(_Extender(
+                    func, reflection.get_callable_name(resolved_func),
+                    _is_batch(resolved_func)))
+        extenders = _extenders[resource] = tuple(extenders)
+    return extenders
+
+
+def _apply_funcs(resource_type, items):
+    stats = _stats
+    for extender in _get_extenders(resource_type):
+        func = helpers.resolve_ref(extender.ref)
+        if not func:
+            continue
+        if stats is None:
+            if extender.batch:
+                func(items)
+            else:
+                for response, db_object in items:
+                    func(response, db_object)
+        elif extender.batch:
+            start = time.perf_counter()
+            func(items)
+            stats.record(resource_type, extender.name,
+                         time.perf_counter() - start)
+        else:
+            # One sample per call, as for apply_funcs
+            for response, db_object in items:
+                start = time.perf_counter()
+                func(response, db_object)
+                stats.record(resource_type, extender.name,
+                             time.perf_counter() - start)
+
+
 @timeutils.time_it(LOG, min_duration=0.1)
 def apply_funcs(resource_type, response, db_object):
     """Appy registered functions for the said resource type.
@@ -90,10 +165,53 @@ def apply_funcs(resource_type, response, db_object):
     :param db_object: The Database object.
     :returns: None
     """
-    for func in get_funcs(resource_type):
-        resolved_func = helpers.resolve_ref(func)
-        if resolved_func:
-            resolved_func(response, db_object)
+    _apply_funcs(resource_type, [(response, db_object)])
+
+
+@timeutils.time_it(LOG, min_duration=0.1)
+def apply_funcs_batch(resource_type, items):
+    """Apply registered functions for the said resource type to a list.
+
+    The functions registered with @extends_batch are called once with the
+    whole list, the other ones once per item.
+
+    :param resource_type: The resource type to apply funcs for.
+    :param items: A list of (response, db_object) pairs.
+    :returns: None
+    """
+    items = list(items)
+    if items:
+        _apply_funcs(resource_type, items)
+
+
+def enable_stats(buckets=stats_utils.DEFAULT_LATENCY_BUCKETS):
+    """Start timing the functions extending the resources.
+
+    Every call of an extend function, or of a batch extend function with a
+    whole list, is then timed and accounted per resource type and function
+    name. Enabling the statistics again drops the samples recorded so far.
+
+    :param buckets: the upper bounds, in seconds, of the latency histogram
+        buckets.
+    """
+    global _stats
+    _stats = stats_utils.LatencyStats(buckets=buckets)
+
+
+def disable_stats():
+    """Stop timing the extend functions and drop the recorded samples."""
+    global _stats
+    _stats = None
+
+
+def get_stats():
+    """Return a snapshot of the extend functions statistics.
+
+    :returns: a dict ``{resource_type: {function_name: {'count': int,
+        'total_time': float, 'histogram': [(upper_bound, count), ...]}}}``,
+        empty if the statistics are disabled.
+    """
+    return _stats.snapshot() if _stats is not None else {}
 
 
 def extends(resources):
@@ -114,12 +232,33 @@ def extends(resources):
     return decorator
 
 
+def extends_batch(resources):
+    """Use to decorate methods extending a list of resources at once.
+
+    Like @extends, but the decorated method takes a single list of
+    (response, db_object) pairs, so that it can fetch the extension data of
+    all of them with one query. It is also called, with a one item list, by
+    apply_funcs.
+
+    :param resources: Resource collection names. The decorated method will
+                      be registered with each resource as an extend function.
+    :type resources: list of str
+
+    """
+    def decorator(method):
+        setattr(method, _EXTENDS_BATCH, True)
+        _DECORATED_EXTEND_METHODS[method].extend(resources)
+        return method
+    return decorator
+
+
 def has_resource_extenders(klass):
     """Decorator to setup __new__ method in classes to extend resources.
 
-    Any method decorated with @extends above is an unbound method on a class.
-    This decorator sets up the class __new__ method to add the bound
-    method to _resource_extend_functions after object instantiation.
+    Any method decorated with @extends or @extends_batch above is an unbound
+    method on a class. This decorator sets up the class __new__ method to add
+    the bound method to _resource_extend_functions after object
+    instantiation.
     """
     orig_new = klass.__new__
     new_inherited = '__new__' not in klass.__dict__
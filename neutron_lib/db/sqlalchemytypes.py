@@ -12,65 +12,260 @@
 
 """Custom SQLAlchemy types."""
 
+import functools
+
 import netaddr
 from sqlalchemy import types
 
 from neutron_lib._i18n import _
 
 
-class IPAddress(types.TypeDecorator):
+@functools.total_ordering
+class LazyNetaddr:
+    """A netaddr object parsed from its string form on first use.
+
+    Loading a column as a netaddr object costs several microseconds per
+    row, which dominates when listing many rows whose addresses are only
+    serialized back to strings. This keeps the string instead: str() and
+    repr() don't parse it and return the stored text, which is the netaddr
+    canonical form for values written through these types. Comparisons,
+    hashing and any netaddr attribute parse it once. Use to_netaddr() where
+    a real netaddr object is needed, for instance for isinstance checks or
+    netaddr operators.
+    """
+
+    __slots__ = ('_str', '_obj')
+
+    netaddr_type: type
+
+    def __init__(self, value):
+        self._str = value
+        self._obj = None
+
+    def to_netaddr(self):
+        """Return the netaddr object, parsing it on the first call."""
+        if self._obj is None:
+            self._obj = self.netaddr_type(self._str)
+        return self._obj
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.to_netaddr(), name)
+
+    def __str__(self):
+        return self._str
+
+    def __repr__(self):
+        return f"{type(self).__name__}('{self._str}')"
+
+    def __hash__(self):
+        return hash(self.to_netaddr())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyNetaddr):
+            other = other.to_netaddr()
+        return self.to_netaddr() == other
+
+    def __lt__(self, other):
+        if isinstance(other, LazyNetaddr):
+            other = other.to_netaddr()
+        return self.to_netaddr() < other
+
+    def __int__(self):
+        return int(self.to_netaddr())
+
+    def __len__(self):
+        return len(self.to_netaddr())
+
+    def __iter__(self):
+        return iter(self.to_netaddr())
+
+    def __contains__(self, item):
+        if isinstance(item, LazyNetaddr):
+            item = item.to_netaddr()
+        return item in self.to_netaddr()
+
+
+class LazyIPAddress(LazyNetaddr):
+    __slots__ = ()
+    netaddr_type = netaddr.IPAddress
+
+
+class LazyIPNetwork(LazyNetaddr):
+    __slots__ = ()
+    netaddr_type = netaddr.IPNetwork
+
+
+class LazyEUI(LazyNetaddr):
+    __slots__ = ()
+    netaddr_type = netaddr.EUI
+
+
+class _NetaddrType(types.TypeDecorator):
+    """Base of the types storing a netaddr object as a string.
+
+    :param lazy: Load the values as a LazyNetaddr, parsed on first use,
+                 rather than as netaddr objects. Both are accepted as bind
+                 parameters either way.
+    """
 
     impl = types.String(64)
 
     cache_ok = True
 
+    netaddr_type: type
+    lazy_type: type[LazyNetaddr]
+
+    def __init__(self, lazy=False, **kwargs):
+        super().__init__(**kwargs)
+        self.lazy = lazy
+
     def process_result_value(self, value, dialect):
-        return netaddr.IPAddress(value)
+        if value is None:
+            return None
+        if self.lazy:
+            return self.lazy_type(value)
+        return self.netaddr_type(value)
 
     def process_bind_param(self, value, dialect):
-        if not isinstance(value, netaddr.IPAddress):
-            raise AttributeError(_("Received type '%(type)s' and value "
-                                   "'%(value)s'. Expecting netaddr.IPAddress "
-                                   "type.") % {'type': type(value),
-                                               'value': value})
-
+        if not isinstance(value, self.netaddr_type | self.lazy_type):
+            raise AttributeError(
+                _("Received type '%(type)s' and value '%(value)s'. "
+                  "Expecting %(expected)s type.") %
+                {'type': type(value), 'value': value,
+                 'expected': f'netaddr.{self.netaddr_type.__name__}'})
         return str(value)
 
 
-class CIDR(types.TypeDecorator):
+class IPAddress(_NetaddrType):
 
-    impl = types.String(64)
+    cache_ok = True
+
+    netaddr_type = netaddr.IPAddress
+    lazy_type = LazyIPAddress
+
+
+class CIDR(_NetaddrType):
 
     cache_ok = True
 
+    netaddr_type = netaddr.IPNetwork
+    lazy_type = LazyIPNetwork
+
+
+class MACAddress(_NetaddrType):
+
+    cache_ok = True
+
+    netaddr_type = netaddr.EUI
+    lazy_type = LazyEUI
+
+
+class _PackedNetaddrType(types.TypeDecorator):
+    """Base of the types storing a netaddr object as fixed width bytes.
+
+    The Python side is the same as the string types: netaddr objects, or
+    their lazy counterparts, are bound and netaddr objects are loaded. The
+    stored bytes are several times smaller than the strings and, for a
+    given IP version, sort in the same order as the addresses, so range
+    conditions such as between() can use an index.
+    """
+
+    impl = types.LargeBinary
+
+    cache_ok = True
+
+    netaddr_type: type
+    lazy_type: type[LazyNetaddr]
+    length: int
+
+    def load_dialect_impl(self, dialect):
+        # MySQL can't index a BLOB without a prefix length.
+        if dialect.name == 'mysql':
+            return dialect.type_descriptor(types.VARBINARY(self.length))
+        return dialect.type_descriptor(types.LargeBinary(self.length))
+
+    def _to_netaddr(self, value):
+        if isinstance(value, self.lazy_type):
+            return value.to_netaddr()
+        if not isinstance(value, self.netaddr_type):
+            raise AttributeError(
+                _("Received type '%(type)s' and value '%(value)s'. "
+                  "Expecting %(expected)s type.") %
+                {'type': type(value), 'value': value,
+                 'expected': f'netaddr.{self.netaddr_type.__name__}'})
+        return value
+
+
+class PackedIPAddress(_PackedNetaddrType):
+    """An IP address stored as 4 bytes for IPv4 and 16 bytes for IPv6."""
+
+    cache_ok = True
+
+    netaddr_type = netaddr.IPAddress
+    lazy_type = LazyIPAddress
+    length = 16
+
     def process_result_value(self, value, dialect):
-        return netaddr.IPNetwork(value)
+        if value is None:
+            return None
+        return netaddr.IPAddress(int.from_bytes(value, 'big'),
+                                 4 if len(value) == 4 else 6)
 
     def process_bind_param(self, value, dialect):
-        if not isinstance(value, netaddr.IPNetwork):
-            raise AttributeError(_("Received type '%(type)s' and value "
-                                   "'%(value)s'. Expecting netaddr.IPNetwork "
-                                   "type.") % {'type': type(value),
-                                               'value': value})
-        return str(value)
+        return self._to_netaddr(value).packed
 
 
-class MACAddress(types.TypeDecorator):
+class PackedCIDR(_PackedNetaddrType):
+    """An IP network stored as its packed address and prefix length.
 
-    impl = types.String(64)
+    The address keeps its host bits, as the CIDR type does, and is followed
+    by one byte holding the prefix length: 5 bytes for IPv4 and 17 bytes
+    for IPv6. Networks of a given IP version sort by address, then by
+    prefix length.
+    """
 
     cache_ok = True
 
+    netaddr_type = netaddr.IPNetwork
+    lazy_type = LazyIPNetwork
+    length = 17
+
     def process_result_value(self, value, dialect):
-        return netaddr.EUI(value)
+        if value is None:
+            return None
+        return netaddr.IPNetwork(
+            (int.from_bytes(value[:-1], 'big'), value[-1]),
+            version=4 if len(value) == 5 else 6)
 
     def process_bind_param(self, value, dialect):
-        if not isinstance(value, netaddr.EUI):
-            raise AttributeError(_("Received type '%(type)s' and value "
-                                   "'%(value)s'. Expecting netaddr.EUI "
-                                   "type.") % {'type': type(value),
-                                               'value': value})
-        return str(value)
+        value = self._to_netaddr(value)
+        return value.ip.packed + bytes((value.prefixlen,))
+
+
+class PackedMACAddress(_PackedNetaddrType):
+    """A 48 bits MAC address stored as 6 bytes."""
+
+    cache_ok = True
+
+    netaddr_type = netaddr.EUI
+    lazy_type = LazyEUI
+    length = 6
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return netaddr.EUI(int.from_bytes(value, 'big'))
+
+    def process_bind_param(self, value, dialect):
+        value = self._to_netaddr(value)
+        if value.version != 48:
+            raise AttributeError(
+                _("Received %(version)s bits EUI '%(value)s'. Expecting a "
+                  "48 bits MAC address.") %
+                {'version': value.version, 'value': value})
+        return value.packed
 
 
 class TruncatedDateTime(types.TypeDecorator):
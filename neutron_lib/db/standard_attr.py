@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import types
+import weakref
+
 from oslo_utils import timeutils
 import sqlalchemy as sa
 from sqlalchemy import event  # noqa
@@ -91,6 +94,13 @@ class StandardAttribute(model_base.BASEV2):
 
 class HasStandardAttributes:
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # the maps built from the subclasses are outdated when a subclass
+        # is defined or garbage collected
+        _subclasses_changed()
+        weakref.finalize(cls, _subclasses_changed)
+
     @classmethod
     def get_api_collections(cls):
         """Define the API collection this object will appear under.
@@ -220,32 +230,72 @@ def _resource_model_map_helper(rs_map, resource, subclass):
     rs_map[resource] = subclass
 
 
+# The maps built from the HasStandardAttributes subclasses, per map kind and
+# arguments. Dropped by _subclasses_changed.
+_maps = {}
+
+
+def _subclasses_changed():
+    _maps.clear()
+
+
 def get_standard_attr_resource_model_map(include_resources=True,
                                          include_sub_resources=True):
-    rs_map = {}
-    for subclass in HasStandardAttributes.__subclasses__():
-        if include_resources:
-            for resource in subclass.get_api_collections():
-                _resource_model_map_helper(rs_map, resource, subclass)
-        if include_sub_resources:
-            for sub_resource in subclass.get_api_sub_resources():
-                _resource_model_map_helper(rs_map, sub_resource, subclass)
+    """Get the models with standard attributes per API resource.
+
+    The map is built on first use and kept until a model is defined or
+    garbage collected; it references the models weakly.
+
+    :param include_resources: Include the API collections of the models.
+    :param include_sub_resources: Include the API sub-resources of the
+        models.
+    :returns: A read-only mapping of the API resources to their model.
+    :raises RuntimeError: If two models register for the same resource.
+    """
+    key = ('resource_model', include_resources, include_sub_resources)
+    rs_map = _maps.get(key)
+    if rs_map is None:
+        rs_map = weakref.WeakValueDictionary()
+        for subclass in HasStandardAttributes.__subclasses__():
+            if include_resources:
+                for resource in subclass.get_api_collections():
+                    _resource_model_map_helper(rs_map, resource, subclass)
+            if include_sub_resources:
+                for sub_resource in subclass.get_api_sub_resources():
+                    _resource_model_map_helper(rs_map, sub_resource,
+                                               subclass)
+        rs_map = _maps[key] = types.MappingProxyType(rs_map)
     return rs_map
 
 
 def get_tag_resource_parent_map():
-    parent_map = {}
-    for subclass in HasStandardAttributes.__subclasses__():
-        if subclass.validate_tag_support():
-            for collection, resource in (subclass.get_collection_resource_map()
-                                         .items()):
-                if collection in parent_map:
-                    msg = (_("API parent %(collection)s/%(resource)s for "
-                             "model %(subclass)s is already registered.") %
-                           {'collection': collection, 'resource': resource,
-                            'subclass': subclass})
-                    raise RuntimeError(msg)
-                parent_map[collection] = resource
+    """Get the parent API resource of the collections supporting tags.
+
+    The map is built on first use and kept until a model is defined or
+    garbage collected.
+
+    :returns: A read-only mapping of the API collections to their member
+        name.
+    :raises RuntimeError: If two models register for the same collection.
+    """
+    parent_map = _maps.get('tag_resource_parent')
+    if parent_map is None:
+        parent_map = {}
+        for subclass in HasStandardAttributes.__subclasses__():
+            if subclass.validate_tag_support():
+                for collection, resource in (
+                        subclass.get_collection_resource_map().items()):
+                    if collection in parent_map:
+                        msg = (_("API parent %(collection)s/%(resource)s "
+                                 "for model %(subclass)s is already "
+                                 "registered.") %
+                               {'collection': collection,
+                                'resource': resource,
+                                'subclass': subclass})
+                        raise RuntimeError(msg)
+                    parent_map[collection] = resource
+        parent_map = _maps['tag_resource_parent'] = types.MappingProxyType(
+            parent_map)
     return parent_map
 
 
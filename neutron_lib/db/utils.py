@@ -10,11 +10,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
+import binascii
 import contextlib
+import datetime
 import functools
 
 from oslo_db import exception as db_exc
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import excutils
 import sqlalchemy
 from sqlalchemy.ext import associationproxy
@@ -72,6 +76,54 @@ def get_sort_dirs(sorts, page_reverse=False):
     return ['asc' if s[1] else 'desc' for s in sorts]
 
 
+def _encode_cursor_value(value):
+    if isinstance(value, datetime.datetime):
+        return {'datetime': value.isoformat()}
+    if value is None or isinstance(value, str | int | float | bool):
+        return value
+    # e.g. netaddr objects, converted back by model_query for the netaddr
+    # column types.
+    return str(value)
+
+
+def _decode_cursor_value(value):
+    if isinstance(value, dict):
+        return datetime.datetime.fromisoformat(value['datetime'])
+    return value
+
+
+def encode_pagination_cursor(values):
+    """Encode the sort key values of a pagination marker as a cursor.
+
+    :param values: A dict mapping each sort key to the marker's value.
+    :returns: An opaque, URL safe, cursor token that can be given back to
+        decode_pagination_cursor, or as the marker values of a paginated
+        collection query.
+    """
+    data = {key: _encode_cursor_value(value) for key, value in values.items()}
+    token = base64.urlsafe_b64encode(jsonutils.dump_as_bytes(data))
+    return token.decode('ascii').rstrip('=')
+
+
+def decode_pagination_cursor(cursor):
+    """Decode a cursor built by encode_pagination_cursor.
+
+    :param cursor: The cursor token.
+    :returns: A dict mapping each sort key to the marker's value.
+    :raises BadRequest: If the cursor is not valid.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        data = jsonutils.loads(base64.urlsafe_b64decode(cursor + padding))
+        if not isinstance(data, dict):
+            raise ValueError(cursor)
+        return {key: _decode_cursor_value(value)
+                for key, value in data.items()}
+    except (TypeError, ValueError, KeyError, binascii.Error) as e:
+        msg = _("'%s' is not a valid pagination cursor") % cursor
+        raise n_exc.BadRequest(resource='pagination', msg=msg) from e
+
+
 def _is_nested_instance(exception, etypes):
     """Check if exception or its inner excepts are an instance of etypes."""
     return (isinstance(exception, etypes) or
@@ -70,6 +70,7 @@ class CallbackRegistryFixture(fixtures.Fixture):
         is used.
         """
         super().__init__()
+        self._own_manager = not callback_manager
         self.callback_manager = callback_manager or manager.CallbacksManager()
         self.patcher = None
 
@@ -84,6 +85,9 @@ class CallbackRegistryFixture(fixtures.Fixture):
     def _restore(self):
         registry._CALLBACK_MANAGER = self._orig_manager
         self.patcher.stop()
+        if self._own_manager:
+            # Shut down the thread pool of the deferred callbacks.
+            self.callback_manager.clear()
 
 
 class _EnableSQLiteFKsFixture(fixtures.Fixture):
@@ -324,10 +328,12 @@ class DBQueryHooksFixture(fixtures.Fixture):
     def _setUp(self, query_hooks=None):
         self._backup = model_query._model_query_hooks
         model_query._model_query_hooks = query_hooks or {}
+        model_query._hooks_changed()
         self.addCleanup(self._restore)
 
     def _restore(self):
         model_query._model_query_hooks = self._backup
+        model_query._hooks_changed()
 
 
 class RPCFixture(fixtures.Fixture):
@@ -358,10 +364,12 @@ class DBResourceExtendFixture(fixtures.Fixture):
         self._backup = copy.deepcopy(
             resource_extend._resource_extend_functions)
         resource_extend._resource_extend_functions = self.extended_functions
+        resource_extend._funcs_changed()
         self.addCleanup(self._restore)
 
     def _restore(self):
         resource_extend._resource_extend_functions = self._backup
+        resource_extend._funcs_changed()
 
 
 class OpenFixture(fixtures.Fixture):
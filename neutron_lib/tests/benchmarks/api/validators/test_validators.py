@@ -0,0 +1,120 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import subprocess
+import sys
+from unittest import mock
+
+from neutron_lib.api import validators
+from neutron_lib.tests.benchmarks import base
+
+
+class ValidNameRegexBenchmarkTestCase(base.BenchmarkTestCase):
+    """Importing the validators, then building the name regex.
+
+    Both steps run in a fresh interpreter, so that nothing is imported or
+    cached beforehand.
+    """
+
+    SCRIPT = (
+        'import time\n'
+        'start = time.perf_counter()\n'
+        'from neutron_lib.api import validators\n'
+        'imported = time.perf_counter()\n'
+        'built = validators._get_valid_name_regex.cache_info().currsize\n'
+        'validators.valid_name_regex\n'
+        'end = time.perf_counter()\n'
+        'print(built, imported - start, end - imported)\n')
+
+    def test_import_time(self):
+        output = subprocess.run([sys.executable, '-c', self.SCRIPT],
+                                capture_output=True, check=True,
+                                text=True).stdout.split()
+        self.report('import-time', [
+            f'import: {float(output[1]) * 1000:.1f} ms',
+            f'valid_name_regex: {float(output[2]) * 1000:.1f} ms'])
+        self.assertEqual('0', output[0])
+
+
+class IPValidationBenchmarkTestCase(base.BenchmarkTestCase):
+    """The IP validators on valid values, with and without fast path.
+
+    Without fast path, every value is parsed by netaddr.
+    """
+
+    VALUES = {
+        validators.validate_ip_address: ['10.0.0.1', '2001:db8::1'],
+        validators.validate_subnet: ['10.0.0.0/24', '2001:db8::/64'],
+        validators.validate_route_cidr: ['10.0.0.0/24', '2001:db8::/64'],
+    }
+
+    def _netaddr_only(self):
+        return mock.patch.multiple(
+            validators, _is_valid_ip_address=mock.Mock(return_value=False),
+            _parse_cidr=mock.Mock(return_value=None))
+
+    def test_validation_time(self):
+        lines = []
+        for validator, samples in self.VALUES.items():
+            samples = samples * 1000
+            timings = []
+            for netaddr_only in (True, False):
+                if netaddr_only:
+                    with self._netaddr_only():
+                        results, duration = self.measure(
+                            lambda: [validator(sample)
+                                     for sample in samples])
+                else:
+                    results, duration = self.measure(
+                        lambda: [validator(sample) for sample in samples])
+                timings.append(duration / len(samples) * 1e6)
+                self.assertEqual([None] * len(samples), results)
+            lines.append(f'{validator.__name__}: {timings[0]:.2f} us with '
+                         f'netaddr, {timings[1]:.2f} us')
+        self.report('ip-validation', lines)
+
+
+class DuplicatesScalingBenchmarkTestCase(base.BenchmarkTestCase):
+    """The list validators for growing numbers of entries.
+
+    With a linear duplicate detection, the time per entry stays flat as the
+    number of entries grows.
+    """
+
+    def _get_ips(self, count):
+        return [f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'
+                for i in range(count)]
+
+    def test_scaling(self):
+        subnet_id = '01234567-89ab-cdef-0123-456789abcdef'
+        cases = {
+            validators.validate_fixed_ips: lambda ips: [
+                {'ip_address': ip, 'subnet_id': subnet_id} for ip in ips],
+            validators.validate_nameservers: lambda ips: ips,
+            validators.validate_hostroutes: lambda ips: [
+                {'destination': f'{ip}/32', 'nexthop': '192.168.0.1'}
+                for ip in ips],
+            validators._validate_list_of_unique_strings: lambda ips: ips,
+        }
+        lines = []
+        for validator, get_data in cases.items():
+            timings = []
+            for count in (100, 1000, 10000):
+                data = get_data(self._get_ips(count))
+                result, duration = self.measure(validator, data)
+                self.assertIsNone(result)
+                timings.append(f'{count}: {duration / count * 1e6:.2f} us')
+                data.append(data[0])
+                self.assertIsNotNone(validator(data))
+            name = getattr(validator, '__name__', 'list_of_unique_strings')
+            lines.append(f"{name}: {', '.join(timings)} per entry")
+        self.report('duplicates-scaling', lines)
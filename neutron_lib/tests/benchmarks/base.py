@@ -0,0 +1,43 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from testtools import content
+
+from neutron_lib.tests import _base as base
+
+
+class BenchmarkTestCase(base.BaseTestCase):
+    """Base class of the benchmarks.
+
+    The benchmarks are not part of the unit tests, they are run with
+    ``tox -e benchmarks``. Their measurements depend on the host, so they
+    are reported as details of the test results rather than asserted.
+    """
+
+    @staticmethod
+    def measure(func, *args, iterations=1, **kwargs):
+        """Run func iterations times.
+
+        :returns: A tuple with the result of the last call and the mean
+            time of a call, in seconds.
+        """
+        result = None
+        start = time.perf_counter()
+        for _i in range(iterations):
+            result = func(*args, **kwargs)
+        return result, (time.perf_counter() - start) / iterations
+
+    def report(self, name, lines):
+        """Attach the lines of a report to the test result."""
+        self.addDetail(name, content.text_content('\n'.join(lines)))
@@ -0,0 +1,70 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sqlalchemy as sa
+
+from neutron_lib import constants
+from neutron_lib import context
+from neutron_lib.db import model_query
+from neutron_lib.tests.benchmarks import base
+from neutron_lib.tests.unit.db import test_model_query
+
+
+class RbacStrategyBenchmarkTestCase(base.BenchmarkTestCase,
+                                    test_model_query.ModelQueryDbTestCase):
+    """The RBAC strategies on a seeded SQLite schema.
+
+    The report holds the time to load the networks of a project and the
+    query plan of each strategy.
+    """
+
+    NETWORKS = 2000
+    RBAC_PER_NETWORK = 3
+    ITERATIONS = 5
+
+    def setUp(self):
+        super().setUp()
+        networks = []
+        for i in range(self.NETWORKS):
+            network = test_model_query.FakeNetwork(
+                id=f'net-{i}', project_id=f'project-{i}')
+            network.rbac_entries = [
+                test_model_query.FakeRBAC(target_project=f'project-{i + j}',
+                                          action=constants.ACCESS_SHARED)
+                for j in range(1, self.RBAC_PER_NETWORK + 1)]
+            networks.append(network)
+        with self.session.begin():
+            self.session.add_all(networks)
+        self.ctx = context.Context('user', 'project-10')
+
+    def test_rbac_strategies(self):
+        lines = []
+        results = {}
+        for strategy in model_query.RBAC_STRATEGIES:
+            model_query.set_rbac_strategy(
+                strategy, model=test_model_query.FakeNetwork)
+            query = model_query.query_with_hooks(
+                self.ctx, test_model_query.FakeNetwork, field='id')
+            statement = query.statement.compile(
+                self.session.get_bind(),
+                compile_kwargs={'literal_binds': True})
+            plan = self.session.execute(
+                sa.text(f'EXPLAIN QUERY PLAN {statement}')).fetchall()
+            results[strategy], elapsed = self.measure(
+                lambda: sorted(row.id for row in query),
+                iterations=self.ITERATIONS)
+            lines.append(f'{strategy}: {elapsed * 1000:.2f}ms')
+            lines.extend(f'    {row[-1]}' for row in plan)
+        self.report('rbac-strategies', lines)
+        self.assertEqual(results[model_query.RBAC_STRATEGY_JOIN],
+                         results[model_query.RBAC_STRATEGY_EXISTS])
+        self.assertEqual(5, len(results[model_query.RBAC_STRATEGY_JOIN]))
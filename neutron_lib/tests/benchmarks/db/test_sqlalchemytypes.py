@@ -0,0 +1,143 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import tracemalloc
+
+import netaddr
+import sqlalchemy as sa
+
+from neutron_lib.db import sqlalchemytypes
+from neutron_lib.tests.benchmarks import base
+from neutron_lib.tests.unit.db import test_sqlalchemytypes
+
+
+class NetaddrTypesBenchmarkTestCase(
+        base.BenchmarkTestCase,
+        test_sqlalchemytypes.SqlAlchemyTypesBaseTestCase):
+    """Loading addresses as netaddr objects and as lazy values.
+
+    The report holds the rows/s, with and without serializing the values
+    back to strings, and the memory held by the loaded rows.
+    """
+
+    ROWS = 10000
+
+    def _get_test_table(self, meta):
+        return sa.Table(
+            'fakenetaddrbenchmarks',
+            meta,
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('ip', sa.String(64)),
+            sa.Column('cidr', sa.String(64)),
+            sa.Column('mac', sa.String(64)))
+
+    def setUp(self):
+        super().setUp()
+        rows = [{'id': i,
+                 'ip': f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}',
+                 'cidr': str(netaddr.IPNetwork(f'2001:db8:{i:x}::/64')),
+                 'mac': str(netaddr.EUI(0xfa163e000000 + i))}
+                for i in range(self.ROWS)]
+        with self.engine.connect() as conn, conn.begin():
+            conn.execute(self.test_table.insert(), rows)
+
+    def _load(self, lazy):
+        columns = self.test_table.c
+        query = sa.select(
+            sa.type_coerce(columns.ip, sqlalchemytypes.IPAddress(lazy=lazy)),
+            sa.type_coerce(columns.cidr, sqlalchemytypes.CIDR(lazy=lazy)),
+            sa.type_coerce(columns.mac,
+                           sqlalchemytypes.MACAddress(lazy=lazy)))
+        with self.engine.connect() as conn:
+            return conn.execute(query).fetchall()
+
+    def test_netaddr_types(self):
+        lines = []
+        results = {}
+        for lazy in (False, True):
+            tracemalloc.start()
+            rows, loaded = self.measure(self._load, lazy)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            results[lazy], serialized = self.measure(
+                lambda: [tuple(str(value) for value in row)
+                         for row in rows])
+            serialized += loaded
+            lines.append(
+                f"{'lazy' if lazy else 'netaddr'}: "
+                f"{self.ROWS / loaded:.0f} rows/s loaded, "
+                f"{self.ROWS / serialized:.0f} rows/s serialized, "
+                f"{memory / self.ROWS:.0f} bytes/row")
+            rows = None
+        self.report('netaddr-types', lines)
+        self.assertEqual(results[False], results[True])
+        self.assertEqual(self.ROWS, len(results[True]))
+
+
+class PackedNetaddrTypesBenchmarkTestCase(
+        base.BenchmarkTestCase,
+        test_sqlalchemytypes.SqlAlchemyTypesBaseTestCase):
+    """Looking up a /24 in string and in packed IP address columns.
+
+    The string column doesn't sort as the addresses do, so its lookup loads
+    every address to filter them. The report holds the stored size of each
+    indexed column and the time of its lookup.
+    """
+
+    ROWS = 10000
+
+    def _get_test_table(self, meta):
+        return sa.Table(
+            'fakepackedbenchmarks',
+            meta,
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('ip', sqlalchemytypes.IPAddress, index=True),
+            sa.Column('packed_ip', sqlalchemytypes.PackedIPAddress,
+                      index=True))
+
+    def setUp(self):
+        super().setUp()
+        ips = [netaddr.IPAddress(0x0a000000 + i) for i in range(self.ROWS)]
+        with self.engine.connect() as conn, conn.begin():
+            conn.execute(self.test_table.insert(),
+                         [{'id': i, 'ip': ip, 'packed_ip': ip}
+                          for i, ip in enumerate(ips)])
+
+    def _stored_size(self, conn, column):
+        return conn.execute(sa.select(sa.func.sum(sa.func.length(
+            sa.type_coerce(column, sa.LargeBinary))))).scalar()
+
+    def test_packed_types(self):
+        columns = self.test_table.c
+        network = netaddr.IPNetwork('10.0.17.0/24')
+        with self.engine.connect() as conn:
+            sizes = [self._stored_size(conn, columns.ip),
+                     self._stored_size(conn, columns.packed_ip)]
+            string_ips, string_time = self.measure(
+                lambda: sorted(
+                    ip for ip in conn.execute(
+                        sa.select(columns.ip)).scalars()
+                    if ip in network))
+            packed_ips, packed_time = self.measure(
+                lambda: conn.execute(
+                    sa.select(columns.packed_ip).where(
+                        columns.packed_ip.between(
+                            netaddr.IPAddress(network.first),
+                            netaddr.IPAddress(network.last))
+                    ).order_by(columns.packed_ip)).scalars().all())
+        self.report('packed-types', [
+            f'string: {sizes[0]} bytes stored, '
+            f'/24 lookup in {string_time * 1000:.2f} ms',
+            f'packed: {sizes[1]} bytes stored, '
+            f'/24 lookup in {packed_time * 1000:.2f} ms'])
+        self.assertEqual(list(network), string_ips)
+        self.assertEqual(string_ips, packed_ips)
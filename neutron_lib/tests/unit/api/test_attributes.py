@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+from unittest import mock
+
 from oslo_utils import uuidutils
 import testtools
 from webob import exc
@@ -20,6 +23,7 @@ from neutron_lib.api.definitions import network
 from neutron_lib.api.definitions import port
 from neutron_lib.api.definitions import subnet
 from neutron_lib.api.definitions import subnetpool
+from neutron_lib.api import validators
 from neutron_lib import constants
 from neutron_lib import context
 from neutron_lib import exceptions
@@ -197,6 +201,169 @@ class TestAttributeInfo(base.BaseTestCase):
         self.assertRaises(self._EXC_CLS, attr_inst.convert_values,
                           {'key': 1}, self._EXC_CLS)
 
+    def test_fill_dict_populate_defaults(self):
+        attr_info = {
+            'key': {
+                'allow_post': True,
+                'default': {},
+                'dict_populate_defaults': True,
+                'validate': {
+                    'type:dict': {
+                        'foo': {'default': 1, 'type:non_negative': None},
+                        'bar': {
+                            'default': {},
+                            'dict_populate_defaults': True,
+                            'type:dict': {
+                                'baz': {'default': 2,
+                                        'type:non_negative': None},
+                            },
+                        },
+                        'qux': {
+                            'type:dict': {
+                                'quux': {'default': 3,
+                                         'type:non_negative': None},
+                            },
+                        },
+                    },
+                },
+            },
+        }
+        attr_inst = attributes.AttributeInfo(attr_info)
+        self._test_fill_default_value(
+            attr_inst,
+            {'key': {'foo': 1, 'bar': {'baz': 2}, 'qux': None}}, {})
+        self._test_fill_default_value(
+            attr_inst,
+            {'key': {'foo': 5, 'bar': {'baz': 2}, 'qux': {}}},
+            {'key': {'foo': 5, 'qux': {}}})
+
+    def test_plans_cached(self):
+        attr_info = {
+            'key': {
+                'allow_post': True,
+                'convert_to': converters.convert_to_int,
+            },
+        }
+        attributes.AttributeInfo(attr_info).convert_values({'key': '1'})
+        plans = attributes._plans[id(attr_info)][3]
+        attributes.AttributeInfo(attr_info).convert_values({'key': '1'})
+        self.assertIs(plans, attributes._plans[id(attr_info)][3])
+        self.assertEqual(1, len(plans))
+
+    def test_plans_invalidated_on_extend(self):
+        attr_info = {
+            'key': {
+                'allow_post': True,
+                'convert_to': converters.convert_to_int,
+            },
+        }
+        attr_inst = attributes.AttributeInfo(attr_info)
+        self._test_convert_value(attr_inst, {'key': 1}, {'key': '1'})
+        self._test_fill_default_value(attr_inst, {'key': '1'}, {'key': '1'})
+
+        attr_info['other_key'] = {
+            'allow_post': True,
+            'default': False,
+            'convert_to': converters.convert_to_boolean,
+        }
+        self._test_convert_value(attr_inst, {'key': 1, 'other_key': True},
+                                 {'key': '1', 'other_key': 'true'})
+        self._test_fill_default_value(attr_inst,
+                                      {'key': '1', 'other_key': False},
+                                      {'key': '1'})
+
+    def test_plans_invalidated(self):
+        attr_info = {
+            'key': {
+                'allow_post': True,
+                'convert_to': converters.convert_to_int,
+            },
+        }
+        attr_inst = attributes.AttributeInfo(attr_info)
+        self._test_convert_value(attr_inst, {'key': 1}, {'key': '1'})
+
+        attr_info['key'] = {
+            'allow_post': True,
+            'validate': {'type:uuid': None},
+        }
+        attributes.invalidate_plans()
+        self.assertNotIn(id(attr_info), attributes._plans)
+        self.assertRaises(exceptions.InvalidInput, self._test_convert_value,
+                          attr_inst, {'key': '1'}, {'key': '1'})
+
+    def test_plans_invalidated_on_validator_change(self):
+        attr_inst = attributes.AttributeInfo(
+            {'key': {'validate': {'type:uuid': None}}})
+        uuid = uuidutils.generate_uuid()
+        attr_inst.convert_values({'key': uuid})
+        attr_inst.convert_values_bulk([{'key': uuid}])
+        validator = mock.Mock(return_value='invalid')
+        with mock.patch.dict(validators.validators,
+                             {'type:uuid': validator}):
+            self.assertRaises(exceptions.InvalidInput,
+                              attr_inst.convert_values, {'key': uuid})
+            self.assertIsInstance(
+                attr_inst.convert_values_bulk([{'key': uuid}])[0],
+                exceptions.InvalidInput)
+            validator.assert_has_calls([mock.call(uuid, None)] * 2)
+        attr_inst.convert_values({'key': uuid})
+        self.assertEqual([None], attr_inst.convert_values_bulk(
+            [{'key': uuid}]))
+        self.assertEqual(2, validator.call_count)
+
+    def _get_port_bodies(self, count):
+        attr_inst = attributes.AttributeInfo(port.RESOURCE_ATTRIBUTE_MAP[
+            port.COLLECTION_NAME])
+        bodies = []
+        for i in range(count):
+            body = {'network_id': uuidutils.generate_uuid(),
+                    'name': f'port-{i}',
+                    'mac_address': f'fa:16:3e:00:{i >> 8 & 255:02x}:'
+                                   f'{i & 255:02x}',
+                    'admin_state_up': 'true',
+                    'project_id': 'project',
+                    'tenant_id': 'project'}
+            attr_inst.fill_post_defaults(body)
+            bodies.append(body)
+        return attr_inst, bodies
+
+    def _convert_values(self, attr_inst, bodies, exc_cls):
+        errors = []
+        for body in bodies:
+            try:
+                attr_inst.convert_values(body, exc_cls)
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+    def test_convert_values_bulk(self):
+        attr_inst, bodies = self._get_port_bodies(6)
+        bodies[1]['network_id'] = 'net'
+        bodies[2]['mac_address'] = 'ff:ff:ff:ff:ff:ff'
+        bodies[3]['admin_state_up'] = 'maybe'
+        bodies[4]['mac_address'] = 'mac'
+        bodies[4]['name'] = 42
+        bodies[5]['name'] = constants.ATTR_NOT_SPECIFIED
+        expected_bodies = copy.deepcopy(bodies)
+        expected = self._convert_values(attr_inst, expected_bodies,
+                                        self._EXC_CLS)
+
+        errors = attr_inst.convert_values_bulk(bodies, self._EXC_CLS)
+
+        self.assertEqual([None, self._EXC_CLS, self._EXC_CLS,
+                          exceptions.InvalidInput, self._EXC_CLS, None],
+                         [type(e) if e else None for e in expected])
+        self.assertEqual([type(e) if e else None for e in expected],
+                         [type(e) if e else None for e in errors])
+        self.assertEqual([str(e) if e else None for e in expected],
+                         [str(e) if e else None for e in errors])
+        self.assertEqual([expected_bodies[0], expected_bodies[5]],
+                         [bodies[0], bodies[5]])
+        self.assertIs(True, bodies[0]['admin_state_up'])
+        self.assertEqual([], attr_inst.convert_values_bulk([]))
+
     def test_populate_project_id_admin_req(self):
         project_id_1 = uuidutils.generate_uuid()
         project_id_2 = uuidutils.generate_uuid()
@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from neutron_lib.api import attributes
 from neutron_lib.api import extensions
 from neutron_lib import fixture
 from neutron_lib.services import base as service_base
@@ -84,6 +85,17 @@ class TestExtensionDescriptor(base.BaseTestCase):
         self.assertEqual(self.extension_attrs_map,
                          {'resource_one': {'three': 'third'}})
 
+    def test_update_attributes_map_invalidates_plans(self):
+        self._setup_attribute_maps()
+        attr_map = {'three': {'convert_to': int}}
+        self.extension_attrs_map['resource_one'] = attr_map
+        attributes.AttributeInfo(attr_map).convert_values({'three': '3'})
+        self.assertIn(id(attr_map), attributes._plans)
+        extension_description = InheritFromExtensionDescriptor()
+        extension_description.update_attributes_map(self.extended_attributes,
+                                                    self.extension_attrs_map)
+        self.assertNotIn(id(attr_map), attributes._plans)
+
 
 class DummyPlugin(service_base.ServicePluginBase):
 
@@ -11,12 +11,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import importlib.util
+import random
 import string
 from unittest import mock
 
 import netaddr
 
 from neutron_lib._i18n import _
+from neutron_lib.api import attributes
 from neutron_lib.api import converters
 from neutron_lib.api.definitions import extra_dhcp_opt
 from neutron_lib.api import validators
@@ -986,6 +990,28 @@ class TestAttributeValidation(base.BaseTestCase):
         error = "Duplicate items in the list: '{}'".format(str({'a': 'b'}))
         self.assertEqual(error, msg)
 
+    def test__collect_duplicates_same_as_comparisons(self):
+        def collect_duplicates(data_list):
+            seen = []
+            dups = []
+            for datum in data_list:
+                if datum in seen and datum not in dups:
+                    dups.append(datum)
+                    continue
+                seen.append(datum)
+            return dups
+
+        items = ['a', 1, True, 1.0, 0, False, None, (1, 2), [1, 2], (1, [2]),
+                 [1, [2]], {'a': 1}, {'a': True}, {'a': [1]}, {'a': (1,)},
+                 {'a': {'b': [1]}}, {1}, frozenset({1}), set(), [],
+                 collections.OrderedDict(a=1, b=2),
+                 collections.OrderedDict(b=2, a=1), {'a': 1, 'b': 2}]
+        rand = random.Random(42)
+        for _i in range(200):
+            data = rand.choices(items, k=rand.randint(0, 20))
+            self.assertEqual(collect_duplicates(data),
+                             validators._collect_duplicates(data))
+
     def test_validate_dict_type(self):
         for value in (None, True, '1', []):
             self.assertEqual(f"'{value}' is not a dictionary",
@@ -1490,3 +1516,224 @@ class TestAddressNotMulticastValidation(base.BaseTestCase):
         ):
             result = validators.validate_mac_address_not_multicast(data)
             self.assertIsNotNone(result)
+
+
+class TestValidNameRegex(base.BaseTestCase):
+
+    def test_same_as_eager(self):
+        build = validators._build_regex_range.__wrapped__
+        expected = validators.valid_name_regex_base % (
+            build(ws=False, invert=True), build(),
+            build(ws=False, invert=True))
+        self.assertEqual(expected, validators.valid_name_regex)
+        self.assertIs(validators._get_valid_name_regex(),
+                      validators._get_valid_name_regex())
+
+    def test_unknown_attribute(self):
+        self.assertRaises(AttributeError, getattr, validators, 'fake')
+
+    def test_import_does_not_build_regex(self):
+        spec = importlib.util.find_spec(validators.__name__)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        self.assertEqual(0, module._build_regex_range.cache_info().currsize)
+        self.assertEqual(
+            0, module._get_valid_name_regex.cache_info().currsize)
+
+
+class TestValidateBulk(base.BaseTestCase):
+
+    UUIDS = ['01234567-89ab-cdef-0123-456789abcdef',
+             '01234567-89AB-CDEF-0123-456789ABCDEF',
+             '0123456789abcdef0123456789abcdef',
+             '{01234567-89ab-cdef-0123-456789abcdef}',
+             '01234567-89ab-cdef-0123-456789abcdef\n',
+             '01234567-89ab-cdef-0123-456789abcde', '', 'uuid', 1, None]
+    MACS = ['fa:16:3e:00:00:01', 'FA:16:3E:00:00:01', 'fa-16-3e-00-00-01',
+            'fa163e000001', 'fa:16:3e:00:00:01\n', ' fa:16:3e:00:00:01',
+            '00:00:00:00:00:00', 'ff:ff:ff:ff:ff:ff', 'FF:FF:FF:FF:FF:FF',
+            'fa:16:3e:00:00', 'fa:16:3e:00:00:0g', '', 1, None]
+
+    def _test_validate_bulk(self, validator, values):
+        self.assertEqual([validator(value) for value in values],
+                         validators.validate_bulk(validator, values))
+
+    def test_validate_uuid_bulk(self):
+        self._test_validate_bulk(validators.validate_uuid, self.UUIDS)
+        self._test_validate_bulk(validators.validate_uuid_or_none,
+                                 self.UUIDS)
+
+    def test_validate_mac_address_bulk(self):
+        self._test_validate_bulk(validators.validate_mac_address, self.MACS)
+        self._test_validate_bulk(validators.validate_mac_address_or_none,
+                                 self.MACS)
+
+    def test_validate_bulk_fallback(self):
+        self.assertEqual(
+            [None, validators.validate_range(5, [1, 4])],
+            validators.validate_bulk(validators.validate_range, [2, 5],
+                                     [1, 4]))
+        self.assertEqual([], validators.validate_bulk(
+            validators.validate_uuid, []))
+
+
+class TestIPValidationFastPath(base.BaseTestCase):
+
+    VALIDATORS = (validators.validate_ip_address, validators.validate_subnet,
+                  validators.validate_route_cidr)
+
+    def _netaddr_only(self):
+        return mock.patch.multiple(
+            validators, _is_valid_ip_address=mock.Mock(return_value=False),
+            _parse_cidr=mock.Mock(return_value=None))
+
+    def _get_samples(self, count):
+        rand = random.Random(42)
+
+        def number(low, high):
+            value = str(rand.randint(low, high))
+            return '0' + value if rand.random() < 0.1 else value
+
+        def address():
+            if rand.random() < 0.5:
+                return '.'.join(number(0, 260) for _i in range(4))
+            ip = netaddr.IPAddress(rand.getrandbits(128) >>
+                                   rand.choice((0, 64, 112, 126)), 6)
+            return ip.format(dialect=rand.choice(
+                (netaddr.ipv6_compact, netaddr.ipv6_full,
+                 netaddr.ipv6_verbose)))
+
+        def mutate(value):
+            i = rand.randint(0, len(value))
+            choice = rand.random()
+            if choice < 0.4:
+                return value[:i] + value[i + 1:]
+            return (value[:i] +
+                    rand.choice('0123456789abcdefgABCDEF:./ \n%') +
+                    value[i:])
+
+        samples = [None, 1, [], b'10.0.0.1', '', '/', '::', '::/0',
+                   '0.0.0.0/0', '::1', '::1/128', '127.0.0.0/8',
+                   '127.0.0.1/32', '::ffff:10.0.0.1', '::ffff:10.0.0.1/128',
+                   '10.0.0.1%eth0', 'fe80::1%eth0', '10.0.0.1/24\n']
+        while len(samples) < count:
+            value = address()
+            if rand.random() < 0.6:
+                value += '/' + number(0, 130)
+            while rand.random() < 0.3:
+                value = mutate(value)
+            samples.append(value)
+        return samples
+
+    def test_same_as_netaddr(self):
+        samples = self._get_samples(1000)
+        results = [[validator(sample) for sample in samples]
+                   for validator in self.VALIDATORS]
+        with self._netaddr_only():
+            expected = [[validator(sample) for sample in samples]
+                        for validator in self.VALIDATORS]
+        for validator, result, expected_result in zip(
+                self.VALIDATORS, results, expected):
+            self.assertEqual(
+                [(sample, res) for sample, res in zip(samples,
+                                                      expected_result)],
+                [(sample, res) for sample, res in zip(samples, result)],
+                validator.__name__)
+        self.assertGreater(sum(res is None for res in expected[0]), 100)
+        self.assertGreater(sum(res is None for res in expected[1]), 100)
+
+
+class TestMemoizeValidator(base.BaseTestCase):
+
+    UUID = '01234567-89ab-cdef-0123-456789abcdef'
+
+    def _memoize(self, validation_type, **kwargs):
+        validators.memoize_validator(validation_type, **kwargs)
+        self.addCleanup(validators.unmemoize_validator, validation_type)
+
+    def _get_stats(self, validation_type):
+        return validators.get_memoize_stats()[validation_type]
+
+    def test_memoize(self):
+        self._memoize('uuid')
+        validator = validators.get_validator('type:uuid')
+        self.assertIsNot(validators.validate_uuid, validator)
+        for _i in range(3):
+            self.assertIsNone(validator(self.UUID))
+            self.assertEqual("'uuid' is not a valid UUID", validator('uuid'))
+        self.assertEqual({'hits': 4, 'misses': 2, 'hit_rate': 4 / 6,
+                          'maxsize': validators.DEFAULT_MEMOIZE_MAXSIZE,
+                          'currsize': 2},
+                         self._get_stats('type:uuid'))
+
+    def test_not_memoized_values(self):
+        self._memoize('type:string', max_data_len=8)
+        self._memoize('type:values')
+        validate_string = validators.get_validator('string')
+        self.assertIsNone(validate_string('a' * 9, 9))
+        self.assertEqual("'['a']' is not a valid string",
+                         validate_string(['a']))
+        validate_values = validators.get_validator('values')
+        self.assertIsNone(validate_values('a', ['a', 'b']))
+        self.assertEqual(0, self._get_stats('type:string')['misses'])
+        self.assertEqual(0, self._get_stats('type:values')['misses'])
+        self.assertIsNone(validate_string('a' * 8, 9))
+        self.assertEqual(1, self._get_stats('type:string')['misses'])
+
+    def test_typed(self):
+        self._memoize('integer')
+        validator = validators.get_validator('integer')
+        self.assertIsNone(validator(1))
+        self.assertEqual("'True' is not an integer:boolean", validator(True))
+
+    def test_bounded(self):
+        self._memoize('uuid', maxsize=2)
+        validator = validators.get_validator('uuid')
+        for value in ('a', 'b', 'c', 'a'):
+            validator(value)
+        stats = self._get_stats('type:uuid')
+        self.assertEqual((0, 4, 2), (stats['hits'], stats['misses'],
+                                     stats['currsize']))
+
+    def test_unmemoize(self):
+        self._memoize('uuid')
+        validators.unmemoize_validator('uuid')
+        validators.unmemoize_validator('uuid')
+        self.assertIs(validators.validate_uuid,
+                      validators.get_validator('uuid'))
+        self.assertEqual({}, validators.get_memoize_stats())
+
+    def test_validator_type_error(self):
+        validator = mock.Mock(side_effect=TypeError)
+        validators.add_validator('fake_type_error', validator)
+        self.addCleanup(validators.validators.pop, 'type:fake_type_error')
+        self._memoize('fake_type_error')
+        memoized = validators.get_validator('fake_type_error')
+        self.assertRaises(TypeError, memoized, 'a')
+        self.assertRaises(TypeError, memoized, 'a', ['a'])
+        self.assertEqual([mock.call('a', None), mock.call('a', ['a'])],
+                         validator.call_args_list)
+
+    def test_plans_on_registry_change(self):
+        attr_inst = attributes.AttributeInfo(
+            {'key': {'validate': {'type:uuid': None}}})
+        self._memoize('uuid')
+        attr_inst.convert_values({'key': self.UUID})
+        with mock.patch.dict(validators.validators,
+                             {'type:uuid': validators.validate_uuid}):
+            attr_inst.convert_values({'key': self.UUID})
+        attr_inst.convert_values({'key': self.UUID})
+        stats = self._get_stats('type:uuid')
+        self.assertEqual((1, 1), (stats['hits'], stats['misses']))
+
+    def test_memoize_unknown_type(self):
+        self.assertRaises(KeyError, validators.memoize_validator, 'fake')
+
+    def test_attribute_plans(self):
+        attr_inst = attributes.AttributeInfo(
+            {'key': {'validate': {'type:uuid': None}}})
+        attr_inst.convert_values({'key': self.UUID})
+        self._memoize('uuid')
+        attr_inst.convert_values({'key': self.UUID})
+        attr_inst.convert_values({'key': self.UUID})
+        self.assertEqual(1, self._get_stats('type:uuid')['hits'])
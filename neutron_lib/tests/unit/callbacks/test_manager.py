@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
 from unittest import mock
 
 from oslo_db import exception as db_exc
@@ -47,6 +48,7 @@ def callback_1(*args, **kwargs):
 
 
 callback_id_1 = manager._get_id(callback_1)
+callback_name_1 = manager._get_name(callback_1)
 
 
 def callback_2(*args, **kwargs):
@@ -54,6 +56,7 @@ def callback_2(*args, **kwargs):
 
 
 callback_id_2 = manager._get_id(callback_2)
+callback_name_2 = manager._get_name(callback_2)
 
 
 def callback_raise(*args, **kwargs):
@@ -77,6 +80,7 @@ class CallBacksManagerTestCase(base.BaseTestCase):
     def setUp(self):
         super().setUp()
         self.manager = manager.CallbacksManager()
+        self.addCleanup(self.manager.clear)
         self.event_payload = events.EventPayload(object())
         callback_1.counter = 0
         callback_2.counter = 0
@@ -95,8 +99,9 @@ class CallBacksManagerTestCase(base.BaseTestCase):
         self.assertIsNotNone(
             self.manager._callbacks[resources.PORT][events.BEFORE_CREATE])
         self.assertIn(callback_id_1, self.manager._index)
+        self.assertIs(callback_1, callback_id_1)
         self.assertEqual(self.__module__ +
-                         f'.callback_1-{hash(callback_1)}', callback_id_1)
+                         f'.callback_1-{hash(callback_1)}', callback_name_1)
         self.assertEqual(cancellable,
                          self.manager._callbacks[resources.PORT]
                          [events.BEFORE_CREATE][0][2])
@@ -404,8 +409,8 @@ class CallBacksManagerTestCase(base.BaseTestCase):
         self.assertEqual(1, callback_1.counter)
         callback_ids = _logger.debug.mock_calls[4][1][1]
         # callback_2 should be first in exceution as it has higher priority
-        self.assertEqual(callback_id_2, callback_ids[0])
-        self.assertEqual(callback_id_1, callback_ids[1])
+        self.assertEqual(callback_name_2, callback_ids[0])
+        self.assertEqual(callback_name_1, callback_ids[1])
 
     @mock.patch("neutron_lib.callbacks.manager.LOG")
     def test__notify_loop_skip_log_errors(self, _logger):
@@ -438,6 +443,162 @@ class CallBacksManagerTestCase(base.BaseTestCase):
         self.assertEqual(1, b.counter)
         self.assertEqual(1, c.counter)
 
+    def test_dispatch_rebuilt_on_subscribe(self):
+        self.manager.subscribe(callback_1, 'my-resource', 'my-event', PRI_MED)
+        self.manager.subscribe(callback_2, 'my-resource', 'my-event',
+                               PRI_HIGH, cancellable=True)
+        dispatch = self.manager._dispatch[('my-resource', 'my-event')]
+        self.assertIsInstance(dispatch, tuple)
+        self.assertEqual([callback_id_2, callback_id_1],
+                         [c.id for c in dispatch])
+        self.assertEqual([True, False], [c.cancellable for c in dispatch])
+
+    def test_dispatch_rebuilt_on_unsubscribe(self):
+        self.manager.subscribe(callback_1, 'my-resource', 'my-event')
+        self.manager.subscribe(callback_2, 'my-resource', 'my-event')
+        self.manager.subscribe(callback_1, 'my-resource', 'other-event')
+        self.manager.unsubscribe(callback_2, 'my-resource', 'my-event')
+        self.assertEqual(
+            (callback_id_1,),
+            tuple(c.id for c in
+                  self.manager._dispatch[('my-resource', 'my-event')]))
+        self.manager.unsubscribe_by_resource(callback_1, 'my-resource')
+        self.assertEqual({}, self.manager._dispatch)
+
+    def test_dispatch_rebuilt_on_unsubscribe_all(self):
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.BEFORE_CREATE)
+        self.manager.subscribe(callback_1, resources.ROUTER,
+                               events.AFTER_CREATE)
+        self.manager.unsubscribe_all(callback_1)
+        self.assertEqual({}, self.manager._dispatch)
+
+    def test_publish_unknown_resource_does_not_vivify(self):
+        self.manager.publish('unknown-resource', 'my-event', mock.ANY,
+                             payload=self.event_payload)
+        self.assertNotIn('unknown-resource', self.manager._callbacks)
+        self.assertEqual({}, self.manager._dispatch)
+
+    def test_publish_deferred_after_event(self):
+        caller = threading.current_thread()
+        threads = []
+
+        def _record(*args, **kwargs):
+            threads.append(threading.current_thread())
+
+        self.manager.subscribe(_record, resources.PORT, events.AFTER_CREATE,
+                               deferred=True)
+        self.manager.publish(resources.PORT, events.AFTER_CREATE, self,
+                             payload=self.event_payload)
+        self.manager.wait_deferred()
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(caller, threads[0])
+
+    def test_publish_deferred_ignored_for_cancellable(self):
+        caller = threading.current_thread()
+        threads = []
+
+        def _record(*args, **kwargs):
+            threads.append(threading.current_thread())
+
+        self.manager.subscribe(_record, resources.PORT, events.BEFORE_CREATE,
+                               deferred=True)
+        self.manager.subscribe(_record, resources.PORT, events.AFTER_CREATE,
+                               cancellable=True, deferred=True)
+        self.manager.publish(resources.PORT, events.BEFORE_CREATE, self,
+                             payload=self.event_payload)
+        self.manager.publish(resources.PORT, events.AFTER_CREATE, self,
+                             payload=self.event_payload)
+        self.assertEqual([caller, caller], threads)
+
+    def test_publish_deferred_keeps_priority_group_order(self):
+        calls = []
+        release = threading.Event()
+
+        def _first(*args, **kwargs):
+            release.wait(5)
+            calls.append('first')
+
+        def _second(*args, **kwargs):
+            calls.append('second')
+
+        self.manager.subscribe(_first, 'my-resource', events.AFTER_UPDATE,
+                               PRI_MED, deferred=True)
+        self.manager.subscribe(_second, 'my-resource', events.AFTER_UPDATE,
+                               PRI_MED, deferred=True)
+        self.manager.publish('my-resource', events.AFTER_UPDATE, self,
+                             payload=self.event_payload)
+        release.set()
+        self.manager.wait_deferred()
+        self.assertEqual(['first', 'second'], calls)
+
+    @mock.patch("neutron_lib.callbacks.manager.LOG")
+    def test_publish_deferred_logs_errors(self, _logger):
+        self.manager.subscribe(callback_raise, resources.PORT,
+                               events.AFTER_DELETE, deferred=True)
+        self.manager.publish(resources.PORT, events.AFTER_DELETE, self,
+                             payload=self.event_payload)
+        self.manager.wait_deferred()
+        self.assertEqual(1, _logger.exception.call_count)
+
+    def test__run_deferred_collects_errors(self):
+        self.manager.subscribe(callback_raise, resources.PORT,
+                               events.AFTER_DELETE, deferred=True)
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.AFTER_DELETE, deferred=True)
+        callbacks = self.manager._dispatch[(resources.PORT,
+                                            events.AFTER_DELETE)]
+        errors = self.manager._run_deferred(
+            callbacks, resources.PORT, events.AFTER_DELETE, self,
+            self.event_payload)
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0], exceptions.NotificationError)
+        self.assertEqual(1, callback_1.counter)
+
+    def test_unsubscribe_drops_deferred_flag(self):
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.AFTER_CREATE, deferred=True)
+        self.manager.unsubscribe(callback_1, resources.PORT,
+                                 events.AFTER_CREATE)
+        self.assertEqual({}, self.manager._deferred)
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.AFTER_CREATE)
+        self.assertFalse(self.manager._dispatch[
+            (resources.PORT, events.AFTER_CREATE)][0].deferred)
+
+    def test_unsubscribe_keeps_other_flags(self):
+        for event in (events.AFTER_CREATE, events.AFTER_UPDATE):
+            self.manager.subscribe(callback_1, resources.PORT, event,
+                                   deferred=True, batch=True)
+        deferred = self.manager._deferred[(resources.PORT,
+                                           events.AFTER_UPDATE)]
+        self.manager.unsubscribe(callback_1, resources.PORT,
+                                 events.AFTER_CREATE)
+        expected = {(resources.PORT, events.AFTER_UPDATE): {callback_1}}
+        self.assertEqual(expected, self.manager._deferred)
+        self.assertEqual(expected, self.manager._batch)
+        self.assertIs(deferred, self.manager._deferred[
+            (resources.PORT, events.AFTER_UPDATE)])
+
+    def test_clear_shuts_down_deferred_executor(self):
+        release = threading.Event()
+        calls = []
+
+        def _wait(*args, **kwargs):
+            release.wait(5)
+            calls.append(args)
+
+        self.manager.subscribe(_wait, resources.PORT, events.AFTER_CREATE,
+                               deferred=True)
+        self.manager.publish(resources.PORT, events.AFTER_CREATE, self,
+                             payload=self.event_payload)
+        executor = self.manager._executor
+        release.set()
+        self.manager.clear()
+        self.assertEqual(1, len(calls))
+        self.assertIsNone(self.manager._executor)
+        self.assertRaises(RuntimeError, executor.submit, _wait)
+
     def test_publish_invalid_payload(self):
         self.assertRaises(exceptions.Invalid, self.manager.publish,
                           resources.PORT, events.AFTER_DELETE, self,
@@ -462,3 +623,186 @@ class CallBacksManagerTestCase(base.BaseTestCase):
         self.manager.subscribe(_memo, 'x', 'y')
         self.manager.publish('x', 'y', self, payload=self.event_payload)
         self.assertEqual(self.event_payload, notify_payload[0])
+
+    def test_publish_batch_legacy_subscriber(self):
+        notify_payload = []
+
+        def _memo(resource, event, trigger, payload=None):
+            notify_payload.append(payload)
+
+        payloads = [events.EventPayload(object()) for _ in range(3)]
+        self.manager.subscribe(_memo, 'x', 'y')
+        self.manager.publish_batch('x', 'y', self, payloads)
+        self.assertEqual(payloads, notify_payload)
+
+    def test_publish_batch_batch_subscriber(self):
+        notify_payloads = []
+
+        def _memo(resource, event, trigger, payloads=None):
+            notify_payloads.append(payloads)
+
+        payloads = [events.EventPayload(object()) for _ in range(3)]
+        self.manager.subscribe(_memo, 'x', 'y', batch=True)
+        self.manager.publish_batch('x', 'y', self, payloads)
+        self.assertEqual([payloads], notify_payloads)
+
+    def test_publish_batch_subscriber_single_publish(self):
+        notify_payload = []
+
+        def _memo(resource, event, trigger, payload=None, payloads=None):
+            notify_payload.append((payload, payloads))
+
+        self.manager.subscribe(_memo, 'x', 'y', batch=True)
+        self.manager.publish('x', 'y', self, payload=self.event_payload)
+        self.assertEqual([(self.event_payload, None)], notify_payload)
+
+    def test_publish_batch_empty(self):
+        with mock.patch.object(self.manager, '_notify_batch_loop') as n:
+            self.manager.publish_batch('x', 'y', self, [])
+            n.assert_not_called()
+
+    def test_publish_batch_invalid_payload(self):
+        self.assertRaises(exceptions.Invalid, self.manager.publish_batch,
+                          resources.PORT, events.AFTER_DELETE, self,
+                          [self.event_payload, object()])
+
+    def test_publish_batch_with_exception(self):
+        payloads = [self.event_payload]
+        with mock.patch.object(self.manager, '_notify_batch_loop') as n:
+            n.return_value = ['error']
+            self.assertRaises(exceptions.CallbackFailure,
+                              self.manager.publish_batch,
+                              mock.ANY, events.BEFORE_CREATE, mock.ANY,
+                              payloads)
+            n.assert_has_calls([
+                mock.call(mock.ANY, 'before_create', mock.ANY, payloads),
+                mock.call(mock.ANY, 'abort_create', mock.ANY, payloads)])
+
+    def test_publish_batch_handle_exception(self):
+        self.manager.subscribe(
+            callback_raise, resources.PORT, events.PRECOMMIT_CREATE)
+        e = self.assertRaises(exceptions.CallbackFailure,
+                              self.manager.publish_batch,
+                              resources.PORT, events.PRECOMMIT_CREATE, self,
+                              [self.event_payload, self.event_payload])
+        self.assertEqual(2, len(e.errors))
+
+    def test_publish_batch_deferred(self):
+        notify_payloads = []
+
+        def _memo(resource, event, trigger, payloads=None):
+            notify_payloads.append(payloads)
+
+        payloads = [events.EventPayload(object()) for _ in range(2)]
+        self.manager.subscribe(_memo, resources.PORT, events.AFTER_CREATE,
+                               deferred=True, batch=True)
+        self.manager.publish_batch(resources.PORT, events.AFTER_CREATE,
+                                   self, payloads)
+        self.manager.wait_deferred()
+        self.assertEqual([payloads], notify_payloads)
+
+    def test_stats_disabled_by_default(self):
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.AFTER_CREATE)
+        self.manager.publish(resources.PORT, events.AFTER_CREATE, self,
+                             payload=self.event_payload)
+        self.assertIsNone(self.manager._stats)
+        self.assertEqual({}, self.manager.get_stats())
+
+    def test_stats_enabled(self):
+        self.manager.enable_stats()
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.AFTER_CREATE)
+        self.manager.subscribe(callback_raise, resources.PORT,
+                               events.AFTER_CREATE)
+        for _ in range(3):
+            self.manager.publish(resources.PORT, events.AFTER_CREATE, self,
+                                 payload=self.event_payload)
+        stats = self.manager.get_stats()[(resources.PORT,
+                                          events.AFTER_CREATE)]
+        self.assertEqual(3, stats[callback_name_1]['count'])
+        self.assertEqual(
+            3, sum(count for _b, count in stats[callback_name_1]['histogram']))
+        self.assertEqual(3,
+                         stats[manager._get_name(callback_raise)]['count'])
+
+    def test_stats_disable(self):
+        self.manager.enable_stats()
+        self.manager.subscribe(callback_1, 'x', 'y')
+        self.manager.publish('x', 'y', self)
+        self.manager.disable_stats()
+        self.assertEqual({}, self.manager.get_stats())
+
+    @mock.patch("neutron_lib.callbacks.manager.LOG")
+    def test_dump_stats(self, _logger):
+        self.manager.enable_stats()
+        self.manager.subscribe(callback_1, 'x', 'y')
+        self.manager.subscribe(callback_2, 'x', 'z')
+        self.manager.publish('x', 'y', self)
+        self.manager.publish('x', 'z', self)
+        self.manager.dump_stats(limit=1)
+        self.assertEqual(1, _logger.info.call_count)
+
+    def test_bound_methods_share_id(self):
+        obj = ObjectWithCallback()
+        self.assertEqual(manager._get_id(obj.callback),
+                         manager._get_id(obj.callback))
+        self.assertNotEqual(manager._get_id(obj.callback),
+                            manager._get_id(ObjectWithCallback().callback))
+        self.manager.subscribe(obj.callback, resources.PORT,
+                               events.BEFORE_CREATE)
+        self.manager.unsubscribe(obj.callback, resources.PORT,
+                                 events.BEFORE_CREATE)
+        self.assertEqual({}, self.manager._index)
+
+    def test_callback_name_cached_while_subscribed(self):
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.BEFORE_CREATE)
+        self.assertEqual({}, self.manager._names)
+        with mock.patch.object(manager, '_get_name',
+                               return_value='name') as get_name:
+            self.assertEqual('name', self.manager._get_name(callback_id_1))
+            self.assertEqual('name', self.manager._get_name(callback_id_1))
+            get_name.assert_called_once_with(callback_id_1)
+        self.manager.unsubscribe_all(callback_1)
+        self.assertEqual({}, self.manager._names)
+
+    def test_notification_error_uses_callback_name(self):
+        self.manager.subscribe(callback_raise, resources.PORT,
+                               events.BEFORE_CREATE)
+        e = self.assertRaises(exceptions.CallbackFailure,
+                              self.manager.publish, resources.PORT,
+                              events.BEFORE_CREATE, self,
+                              payload=self.event_payload)
+        self.assertEqual(manager._get_name(callback_raise),
+                         e.errors[0].callback_id)
+
+    @mock.patch.object(manager, '_get_name')
+    def test_publish_debug_disabled_skips_formatting(self, get_name):
+        payload = mock.Mock(spec=events.EventPayload)
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.AFTER_CREATE)
+        with mock.patch.object(manager.LOG, 'isEnabledFor',
+                               return_value=False), \
+                mock.patch.object(manager.LOG, 'debug') as debug:
+            self.manager.publish(resources.PORT, events.AFTER_CREATE, self,
+                                 payload=payload)
+            self.manager.publish_batch(resources.PORT, events.AFTER_CREATE,
+                                       self, [payload])
+        debug.assert_not_called()
+        get_name.assert_not_called()
+        self.assertEqual(2, callback_1.counter)
+
+    @mock.patch.object(manager, '_get_name', return_value='name')
+    def test_publish_debug_enabled_formats(self, get_name):
+        payload = events.EventPayload(object(), resource_id='id')
+        self.manager.subscribe(callback_1, resources.PORT,
+                               events.AFTER_CREATE)
+        with mock.patch.object(manager.LOG, 'isEnabledFor',
+                               return_value=True), \
+                mock.patch.object(manager.LOG, 'debug') as debug:
+            self.manager.publish(resources.PORT, events.AFTER_CREATE, self,
+                                 payload=payload)
+        debug.assert_called_once_with(
+            "Publish callbacks %s for %s (%s), %s", ['name'], resources.PORT,
+            'id', events.AFTER_CREATE)
@@ -22,6 +22,7 @@ from neutron_lib.callbacks import priority_group
 from neutron_lib.callbacks import registry
 from neutron_lib.callbacks import resources
 from neutron_lib import fixture
+from neutron_lib.utils import stats as stats_utils
 
 PRI_CALLBACK = 20
 
@@ -132,13 +133,32 @@ class TestCallbackRegistryDispatching(base.BaseTestCase):
         registry.subscribe(my_callback, 'my-resource', 'my-event')
         self.callback_manager.subscribe.assert_called_with(
             my_callback, 'my-resource', 'my-event',
-            priority_group.PRIORITY_DEFAULT, False)
+            priority_group.PRIORITY_DEFAULT, False, deferred=False,
+            batch=False)
 
     def test_subscribe_explicit_priority(self):
         registry.subscribe(my_callback, 'my-resource', 'my-event',
                            PRI_CALLBACK)
         self.callback_manager.subscribe.assert_called_with(
-            my_callback, 'my-resource', 'my-event', PRI_CALLBACK, False)
+            my_callback, 'my-resource', 'my-event', PRI_CALLBACK, False,
+            deferred=False,
+            batch=False)
+
+    def test_subscribe_deferred(self):
+        registry.subscribe(my_callback, 'my-resource', 'my-event',
+                           deferred=True)
+        self.callback_manager.subscribe.assert_called_with(
+            my_callback, 'my-resource', 'my-event',
+            priority_group.PRIORITY_DEFAULT, False, deferred=True,
+            batch=False)
+
+    def test_subscribe_batch(self):
+        registry.subscribe(my_callback, 'my-resource', 'my-event',
+                           batch=True)
+        self.callback_manager.subscribe.assert_called_with(
+            my_callback, 'my-resource', 'my-event',
+            priority_group.PRIORITY_DEFAULT, False, deferred=False,
+            batch=True)
 
     def test_unsubscribe(self):
         registry.unsubscribe(my_callback, 'my-resource', 'my-event')
@@ -155,6 +175,10 @@ class TestCallbackRegistryDispatching(base.BaseTestCase):
         self.callback_manager.unsubscribe_all.assert_called_with(
             my_callback)
 
+    def test_wait_deferred(self):
+        registry.wait_deferred(timeout=5)
+        self.callback_manager.wait_deferred.assert_called_with(timeout=5)
+
     def test_clear(self):
         registry.clear()
         self.callback_manager.clear.assert_called_with()
@@ -164,3 +188,31 @@ class TestCallbackRegistryDispatching(base.BaseTestCase):
         registry.publish('x', 'y', self, payload=event_payload)
         self.callback_manager.publish.assert_called_with(
             'x', 'y', self, payload=event_payload)
+
+    def test_publish_batch(self):
+        payloads = [events.EventPayload(mock.ANY)]
+        registry.publish_batch('x', 'y', self, payloads)
+        self.callback_manager.publish_batch.assert_called_with(
+            'x', 'y', self, payloads)
+
+    def test_enable_stats(self):
+        registry.enable_stats()
+        self.callback_manager.enable_stats.assert_called_once_with(
+            buckets=stats_utils.DEFAULT_LATENCY_BUCKETS)
+
+    def test_enable_stats_buckets(self):
+        registry.enable_stats(buckets=(0.1, 1.0))
+        self.callback_manager.enable_stats.assert_called_once_with(
+            buckets=(0.1, 1.0))
+
+    def test_disable_stats(self):
+        registry.disable_stats()
+        self.callback_manager.disable_stats.assert_called_once_with()
+
+    def test_get_stats(self):
+        self.assertEqual(self.callback_manager.get_stats.return_value,
+                         registry.get_stats())
+
+    def test_dump_stats(self):
+        registry.dump_stats(limit=10)
+        self.callback_manager.dump_stats.assert_called_once_with(limit=10)
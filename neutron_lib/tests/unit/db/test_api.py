@@ -11,20 +11,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 from unittest import mock
 
 from oslo_db import exception as db_exc
 import osprofiler
 import sqlalchemy
+from sqlalchemy import orm
 from sqlalchemy.orm import exc
 import testtools
 
+from neutron_lib import context
 from neutron_lib.db import api as db_api
+from neutron_lib.db import model_base
 from neutron_lib import exceptions
 from neutron_lib import fixture
 from neutron_lib.tests import _base
 
 
+class FakeParent(model_base.BASEV2, model_base.HasId):
+    __tablename__ = 'db_api_fake_parents'
+
+    children = orm.relationship('FakeChild', lazy='subquery',
+                                back_populates='parent')
+
+
+class FakeChild(model_base.BASEV2, model_base.HasId):
+    __tablename__ = 'db_api_fake_children'
+
+    parent_id = sqlalchemy.Column(
+        sqlalchemy.String(36), sqlalchemy.ForeignKey(
+            'db_api_fake_parents.id', ondelete='CASCADE'),
+        nullable=False)
+    parent = orm.relationship('FakeParent', lazy='joined',
+                              back_populates='children')
+
+
 class TestExceptionToRetryContextManager(_base.BaseTestCase):
 
     def test_translates_single_exception(self):
@@ -210,6 +232,180 @@ class TestDeadLockDecorator(_base.BaseTestCase):
                                    exc_to_raise=db_exc.DBDeadlock())
 
 
+class TestCopyIfLds(_base.BaseTestCase):
+
+    def test_copy(self):
+        item = {'fixed_ips': [{'subnet_id': 'id', 'ip_address': None}],
+                'tags': {'a', ('b', 1)}, 'mtu': 1500, 'shared': True}
+        dup = db_api._copy_if_lds(item)
+        self.assertEqual(item, dup)
+        self.assertIsNot(item['fixed_ips'], dup['fixed_ips'])
+        self.assertIsNot(item['fixed_ips'][0], dup['fixed_ips'][0])
+        self.assertIsNot(item['tags'], dup['tags'])
+
+    def test_copy_other_objects(self):
+        nested = [1]
+        item = [collections.OrderedDict(a=nested), (nested,)]
+        dup = db_api._copy_if_lds(item)
+        self.assertEqual(item, dup)
+        self.assertIsInstance(dup[0], collections.OrderedDict)
+        self.assertIsNot(nested, dup[0]['a'])
+        self.assertIsNot(nested, dup[1][0])
+
+    def test_copy_self_referencing(self):
+        item = {'a': []}
+        item['a'].append(item)
+        dup = db_api._copy_if_lds(item)
+        self.assertIsNot(item, dup)
+        self.assertIs(dup, dup['a'][0])
+
+    def test_no_copy(self):
+        for item in ('str', 1, None, (1, 2), mock.sentinel.obj):
+            self.assertIs(item, db_api._copy_if_lds(item))
+
+
+class TestRetryStats(_base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.sleep = mock.patch('time.sleep').start()
+        db_api.reset_retry_stats()
+        self.addCleanup(db_api.reset_retry_stats)
+
+    def test_retry_stats(self):
+        errors = [db_exc.DBDeadlock(), db_exc.DBDeadlock(),
+                  db_exc.RetryRequest(exc.StaleDataError())]
+
+        @db_api.retry_db_errors
+        def _func(items):
+            if errors:
+                raise errors.pop(0)
+            return items
+
+        self.assertEqual([1], _func([1]))
+
+        stats = db_api.get_retry_stats()
+        self.assertEqual(1, len(stats))
+        name, reasons = stats.popitem()
+        self.assertTrue(name.endswith('_func'))
+        self.assertEqual({'DBDeadlock': 2, 'StaleDataError': 1},
+                         {reason: record['count']
+                          for reason, record in reasons.items()})
+        self.assertEqual(3, self.sleep.call_count)
+
+    def test_no_retry_stats(self):
+        @db_api.retry_db_errors
+        def _func():
+            raise ValueError()
+
+        self.assertRaises(ValueError, _func)
+        self.assertEqual({}, db_api.get_retry_stats())
+
+    def test_retry_stats_exceeded(self):
+        self.useFixture(fixture.DBRetryErrorsFixture(max_retries=2))
+
+        @db_api.retry_db_errors
+        def _func():
+            raise db_exc.DBDeadlock()
+
+        self.assertRaises(db_exc.DBDeadlock, _func)
+        # the last failure isn't retried
+        records = list(db_api.get_retry_stats().values())
+        self.assertEqual(2, records[0]['DBDeadlock']['count'])
+
+
+class RelationshipsDbTestCase(_base.BaseTestCase):
+
+    TABLES = (FakeParent.__table__, FakeChild.__table__)
+
+    def setUp(self):
+        super().setUp()
+        engine = db_api.CONTEXT_WRITER.get_engine()
+        model_base.BASEV2.metadata.create_all(engine, tables=self.TABLES)
+        self.addCleanup(model_base.BASEV2.metadata.drop_all, engine,
+                        tables=self.TABLES)
+        self.session = context.get_admin_context().session
+        self.statements = []
+
+        def _before_execute(conn, cursor, statement, *args):
+            self.statements.append(statement)
+
+        sqlalchemy.event.listen(engine, 'before_cursor_execute',
+                                _before_execute)
+        self.addCleanup(sqlalchemy.event.remove, engine,
+                        'before_cursor_execute', _before_execute)
+
+    def _create(self, count):
+        parents = [FakeParent(id=f'parent-{i}') for i in range(count)]
+        # built with keys rather than relationships
+        children = [FakeChild(id=f'child-{i}', parent_id=f'parent-{i}')
+                    for i in range(count)]
+        with self.session.begin():
+            self.session.add_all(parents)
+            self.session.flush()
+            self.session.add_all(children)
+            del self.statements[:]
+        return parents, children
+
+
+class TestLoadOneToManys(RelationshipsDbTestCase):
+
+    def test_get_eager_relationships(self):
+        mapper = sqlalchemy.inspect(FakeParent)
+        self.assertEqual(('children',),
+                         db_api._get_eager_relationships(mapper))
+        self.assertIs(db_api._get_eager_relationships(mapper),
+                      db_api._get_eager_relationships(mapper))
+
+    def test_relationships_loaded(self):
+        parents, children = self._create(3)
+        for parent, child in zip(parents, children):
+            self.assertEqual([child], parent.__dict__['children'])
+            self.assertIs(parent, child.__dict__['parent'])
+
+    def test_queries_per_mapper(self):
+        self._create(db_api._LOAD_RELS_CHUNK_SIZE + 1)
+        selects = [stmt for stmt in self.statements
+                   if stmt.startswith('SELECT')]
+        # one query per chunk of parents, plus its subquery load; loading
+        # the children collections sets the parent of the children too
+        self.assertEqual(4, len(selects))
+
+    def test_fallback_load(self):
+        with mock.patch.object(db_api, '_load_relationships'):
+            parents, children = self._create(2)
+        self.assertEqual([children[0]], parents[0].__dict__['children'])
+
+
+class TestFkExpiry(RelationshipsDbTestCase):
+
+    def test_get_fk_expiry_plan(self):
+        mapper = sqlalchemy.inspect(FakeChild)
+        plan = db_api._get_fk_expiry_plan(mapper)
+        self.assertEqual(((FakeChild.parent.property, 'parent_id'),), plan)
+        self.assertIs(plan, db_api._get_fk_expiry_plan(mapper))
+        self.assertEqual(
+            (), db_api._get_fk_expiry_plan(sqlalchemy.inspect(FakeParent)))
+
+    def test_delete_expires_parent(self):
+        parents, children = self._create(1)
+        db_api._fk_expiry_plans.clear()
+        with self.session.begin():
+            self.session.delete(children[0])
+            self.session.flush()
+            self.assertNotIn('children', parents[0].__dict__)
+        self.assertEqual([], parents[0].children)
+        self.assertIn(sqlalchemy.inspect(FakeChild), db_api._fk_expiry_plans)
+
+    def test_fk_change_expires_parents(self):
+        parents, children = self._create(2)
+        with self.session.begin():
+            children[0].parent_id = parents[1].id
+        self.assertEqual([], parents[0].children)
+        self.assertEqual(sorted(c.id for c in children),
+                         sorted(c.id for c in parents[1].children))
+
+
 class TestDBProfiler(_base.BaseTestCase):
 
     @mock.patch.object(osprofiler.opts, 'is_trace_enabled',
@@ -10,17 +10,65 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import types
 from unittest import mock
 
+import netaddr
 from oslo_utils import uuidutils
+import sqlalchemy as sa
+from sqlalchemy import orm
 
 from neutron_lib import constants
+from neutron_lib import context
+from neutron_lib.db import api as db_api
+from neutron_lib.db import model_base
 from neutron_lib.db import model_query
+from neutron_lib.db import sqlalchemytypes
+from neutron_lib.db import utils as db_utils
+from neutron_lib import exceptions as n_exc
 from neutron_lib import fixture
 from neutron_lib.tests import _base
 from neutron_lib.utils import helpers
 
 
+class FakeRBAC(model_base.BASEV2, model_base.HasId):
+    __tablename__ = 'model_query_fake_rbacs'
+
+    object_id = sa.Column(sa.String(36),
+                          sa.ForeignKey('model_query_fake_networks.id',
+                                        ondelete='CASCADE'),
+                          nullable=False, index=True)
+    target_project = sa.Column(sa.String(255), nullable=False)
+    action = sa.Column(sa.String(255), nullable=False)
+
+
+class FakeNetwork(model_base.BASEV2, model_base.HasId,
+                  model_base.HasProject):
+    __tablename__ = 'model_query_fake_networks'
+
+    name = sa.Column(sa.String(255))
+    rbac_entries = orm.relationship(FakeRBAC, lazy='subquery',
+                                    cascade='all, delete, delete-orphan')
+
+
+class FakePort(model_base.BASEV2, model_base.HasId):
+    __tablename__ = 'model_query_fake_ports'
+
+    network_id = sa.Column(sa.String(36),
+                           sa.ForeignKey('model_query_fake_networks.id',
+                                         ondelete='CASCADE'),
+                           nullable=False)
+    mac_address = sa.Column(sqlalchemytypes.MACAddress, nullable=False)
+    network = orm.relationship(FakeNetwork, lazy='subquery')
+
+
+class FakeProjectModel(model_base.BASEV2, model_base.HasId,
+                       model_base.HasProject):
+    __tablename__ = 'model_query_fake_project_models'
+
+    name = sa.Column(sa.String(255))
+
+
 # TODO(boden): find a way to test other model_query functions
 
 class TestHooks(_base.BaseTestCase):
@@ -136,3 +184,502 @@ class TestHooks(_base.BaseTestCase):
         rbacs = model_query.get_rbac_actions(model)
         self.assertEqual({constants.ACCESS_EXTERNAL, constants.ACCESS_SHARED},
                          rbacs)
+
+
+class ModelQueryDbTestCase(_base.BaseTestCase):
+
+    TABLES = (FakeNetwork.__table__, FakeRBAC.__table__,
+              FakePort.__table__, FakeProjectModel.__table__)
+
+    def setUp(self):
+        super().setUp()
+        engine = db_api.CONTEXT_WRITER.get_engine()
+        model_base.BASEV2.metadata.create_all(engine, tables=self.TABLES)
+        self.addCleanup(model_base.BASEV2.metadata.drop_all, engine,
+                        tables=self.TABLES)
+        self.useFixture(fixture.DBQueryHooksFixture())
+        self.ctx = context.Context('user', 'project')
+        self.session = self.ctx.session
+        with self.session.begin():
+            self.session.add_all([
+                FakeNetwork(id='own', project_id='project'),
+                FakeNetwork(id='other', project_id='other'),
+                FakeNetwork(id='shared_all', project_id='other',
+                            rbac_entries=[FakeRBAC(
+                                target_project='*',
+                                action=constants.ACCESS_SHARED)]),
+                FakeNetwork(id='shared_to_project', project_id='other',
+                            rbac_entries=[
+                                FakeRBAC(target_project='project',
+                                         action=constants.ACCESS_SHARED),
+                                FakeRBAC(target_project='another',
+                                         action=constants.ACCESS_SHARED)]),
+                FakeNetwork(id='external', project_id='other',
+                            rbac_entries=[FakeRBAC(
+                                target_project='*',
+                                action=constants.ACCESS_EXTERNAL)]),
+                FakeProjectModel(id='own', project_id='project'),
+                FakeProjectModel(id='other', project_id='other'),
+                FakeProjectModel(id='no_project', project_id=None),
+            ])
+        self.scoped = mock.patch.object(
+            model_query.db_utils, 'model_query_scope_is_project',
+            return_value=True).start()
+        mock.patch.object(model_query, '_model_rbac_strategies', {}).start()
+        mock.patch.object(model_query, '_default_rbac_strategy',
+                          model_query.RBAC_STRATEGY_JOIN).start()
+
+    def _ids(self, query):
+        return sorted(row.id for row in query)
+
+
+class TestQueryWithHooks(ModelQueryDbTestCase):
+
+    def test_query_rbac_scope(self):
+        query = model_query.query_with_hooks(self.ctx, FakeNetwork)
+        self.assertEqual(['own', 'shared_all', 'shared_to_project'],
+                         self._ids(query))
+        self.assertEqual(3, query.count())
+
+    def test_query_rbac_scope_other_project(self):
+        ctx = context.Context('user', 'another')
+        query = model_query.query_with_hooks(ctx, FakeNetwork)
+        self.assertEqual(['shared_all', 'shared_to_project'],
+                         self._ids(query))
+
+    def test_query_not_scoped(self):
+        self.scoped.return_value = False
+        query = model_query.query_with_hooks(self.ctx, FakeNetwork)
+        self.assertEqual(5, len(self._ids(query)))
+
+    def test_query_project_scope(self):
+        query = model_query.query_with_hooks(self.ctx, FakeProjectModel)
+        self.assertEqual(['own'], self._ids(query))
+
+    def test_query_project_scope_no_project_id(self):
+        ctx = context.Context('user', None)
+        query = model_query.query_with_hooks(ctx, FakeProjectModel)
+        self.assertEqual(['no_project'], self._ids(query))
+
+    def test_query_field(self):
+        query = model_query.query_with_hooks(self.ctx, FakeProjectModel,
+                                             field='id')
+        self.assertEqual([('own',)], query.all())
+
+    def test_query_invalid_field(self):
+        self.assertRaises(n_exc.InvalidInput, model_query.query_with_hooks,
+                          self.ctx, FakeProjectModel, field='invalid')
+
+    def test_query_as_subquery(self):
+        query = model_query.query_with_hooks(self.ctx, FakeNetwork,
+                                             field='id')
+        outer = self.session.query(FakeNetwork).filter(
+            FakeNetwork.id.in_(query.subquery()))
+        self.assertEqual(['own', 'shared_all', 'shared_to_project'],
+                         self._ids(outer))
+
+    def test_template_cached(self):
+        model_query.query_with_hooks(self.ctx, FakeNetwork)
+        model_query.query_with_hooks(context.Context('user', 'another'),
+                                     FakeNetwork)
+        self.assertEqual(1, len(model_query._query_templates))
+        model_query.query_with_hooks(self.ctx, FakeNetwork, field='id')
+        self.assertEqual(2, len(model_query._query_templates))
+
+    def test_register_hook_invalidates_templates(self):
+        model_query.query_with_hooks(self.ctx, FakeNetwork)
+        generation = model_query._hooks_generation
+        model_query.register_hook(FakeNetwork, 'hook', None, None,
+                                  rbac_actions=constants.ACCESS_EXTERNAL)
+        self.assertEqual({}, model_query._query_templates)
+        self.assertEqual(generation + 1, model_query._hooks_generation)
+        query = model_query.query_with_hooks(self.ctx, FakeNetwork)
+        self.assertEqual(['external', 'own'], self._ids(query))
+
+    def test_hooks_called_on_every_query(self):
+        calls = []
+
+        def _query_hook(ctx, model, query):
+            calls.append(('query', ctx.project_id))
+            return query
+
+        def _filter_hook(ctx, model, query_filter):
+            calls.append(('filter', ctx.project_id))
+            return query_filter & (model.name == sa.null())
+
+        model_query.register_hook(FakeNetwork, 'hook', _query_hook,
+                                  _filter_hook)
+        for project_id in ('project', 'another'):
+            ctx = context.Context('user', project_id)
+            model_query.query_with_hooks(ctx, FakeNetwork).all()
+        self.assertEqual([('query', 'project'), ('filter', 'project'),
+                          ('query', 'another'), ('filter', 'another')],
+                         calls)
+
+
+class TestRbacStrategy(ModelQueryDbTestCase):
+
+    def test_set_rbac_strategy_default(self):
+        model_query.set_rbac_strategy(model_query.RBAC_STRATEGY_EXISTS)
+        self.assertEqual(model_query.RBAC_STRATEGY_EXISTS,
+                         model_query.get_rbac_strategy(FakeNetwork))
+
+    def test_set_rbac_strategy_model(self):
+        model_query.set_rbac_strategy(model_query.RBAC_STRATEGY_EXISTS,
+                                      model=FakeNetwork)
+        self.assertEqual(model_query.RBAC_STRATEGY_EXISTS,
+                         model_query.get_rbac_strategy(FakeNetwork))
+        self.assertEqual(model_query.RBAC_STRATEGY_JOIN,
+                         model_query.get_rbac_strategy(FakeProjectModel))
+
+    def test_set_rbac_strategy_invalid(self):
+        self.assertRaises(n_exc.InvalidInput, model_query.set_rbac_strategy,
+                          'invalid')
+
+    def test_exists_strategy_statement(self):
+        model_query.set_rbac_strategy(model_query.RBAC_STRATEGY_EXISTS,
+                                      model=FakeNetwork)
+        query = model_query.query_with_hooks(self.ctx, FakeNetwork)
+        statement = str(query.statement).upper()
+        self.assertIn('EXISTS', statement)
+        self.assertNotIn('JOIN', statement)
+        self.assertNotIn('GROUP BY', statement)
+
+    def _get_ids(self, strategy, filters=None, ctx=None):
+        model_query.set_rbac_strategy(strategy, model=FakeNetwork)
+        ctx = ctx or self.ctx
+        query = model_query.query_with_hooks(ctx, FakeNetwork)
+        query = model_query.apply_filters(query, FakeNetwork, filters, ctx)
+        return self._ids(query)
+
+    def _test_same_result(self, filters=None, ctx=None):
+        expected = self._get_ids(model_query.RBAC_STRATEGY_JOIN, filters,
+                                 ctx)
+        self.assertEqual(
+            expected,
+            self._get_ids(model_query.RBAC_STRATEGY_EXISTS, filters, ctx))
+        return expected
+
+    def test_query_scoped(self):
+        self.assertEqual(['own', 'shared_all', 'shared_to_project'],
+                         self._test_same_result())
+
+    def test_query_scoped_shared(self):
+        self.assertEqual(['shared_all', 'shared_to_project'],
+                         self._test_same_result({'shared': [True]}))
+
+    def test_query_scoped_not_shared(self):
+        self.assertEqual(['own'],
+                         self._test_same_result({'shared': [False]}))
+
+    def test_query_not_scoped_shared(self):
+        self.scoped.return_value = False
+        self.assertEqual(['shared_all', 'shared_to_project'],
+                         self._test_same_result({'shared': [True]}))
+
+    def test_query_not_scoped_not_shared(self):
+        self.scoped.return_value = False
+        self.assertEqual(['external', 'other', 'own'],
+                         self._test_same_result({'shared': [False]}))
+
+    def test_query_not_scoped_shared_no_context(self):
+        self.scoped.return_value = False
+        for strategy in model_query.RBAC_STRATEGIES:
+            model_query.set_rbac_strategy(strategy, model=FakeNetwork)
+            query = model_query.query_with_hooks(self.ctx, FakeNetwork)
+            query = model_query.apply_filters(query, FakeNetwork,
+                                              {'shared': [True]})
+            self.assertEqual(['shared_all'], self._ids(query))
+
+
+class TestCollectionPagination(ModelQueryDbTestCase):
+
+    SORTS = [('project_id', True)]
+
+    def setUp(self):
+        super().setUp()
+        self.scoped.return_value = False
+
+    def _paginate(self, get_marker, page_reverse=False, model=FakeNetwork,
+                  sorts=SORTS):
+        pages = []
+        marker = None
+        while True:
+            kwargs = {'marker_values': marker} if marker else {}
+            page = model_query.get_collection_query(
+                self.ctx, model, sorts=sorts, limit=2,
+                page_reverse=page_reverse, **kwargs).all()
+            if not page:
+                return pages
+            pages.append([row.id for row in page])
+            marker = get_marker(page[-1])
+
+    def _values(self, row, model=FakeNetwork, sorts=SORTS):
+        keys = model_query.get_pagination_sort_keys(model, sorts)
+        return {key: getattr(row, key) for key in keys}
+
+    def test_get_pagination_sort_keys(self):
+        self.assertEqual(
+            ['project_id', 'id'],
+            model_query.get_pagination_sort_keys(FakeNetwork, self.SORTS))
+        self.assertEqual(
+            ['id'],
+            model_query.get_pagination_sort_keys(FakeNetwork, [('id', True)]))
+
+    def test_marker_values(self):
+        pages = self._paginate(self._values)
+        self.assertEqual([['external', 'other'],
+                          ['shared_all', 'shared_to_project'],
+                          ['own']], pages)
+
+    def test_marker_values_page_reverse(self):
+        pages = self._paginate(self._values, page_reverse=True)
+        # only the requested sort keys are reversed
+        self.assertEqual([['own', 'external'],
+                          ['other', 'shared_all'],
+                          ['shared_to_project']], pages)
+
+    def test_marker_values_cursor(self):
+        pages = self._paginate(
+            lambda row: db_utils.encode_pagination_cursor(self._values(row)))
+        self.assertEqual(self._paginate(self._values), pages)
+
+    def test_marker_values_cursor_netaddr_column(self):
+        with self.session.begin():
+            self.session.add_all([
+                FakePort(id=f'port-{i}', network_id='own',
+                         mac_address=netaddr.EUI(f'fa:16:3e:00:00:{i:02x}'))
+                for i in range(5)])
+        sorts = [('mac_address', True)]
+        pages = self._paginate(
+            lambda row: db_utils.encode_pagination_cursor(
+                self._values(row, model=FakePort, sorts=sorts)),
+            model=FakePort, sorts=sorts)
+        self.assertEqual([['port-0', 'port-1'], ['port-2', 'port-3'],
+                          ['port-4']], pages)
+        self.assertRaises(
+            n_exc.BadRequest, model_query.get_collection_query,
+            self.ctx, FakePort, sorts=sorts, limit=2,
+            marker_values=db_utils.encode_pagination_cursor(
+                {'mac_address': 'not a mac', 'id': 'port-0'}))
+
+    def test_marker_values_same_as_marker_obj(self):
+        marker_obj = self.session.get(FakeNetwork, 'other')
+        expected = model_query.get_collection_query(
+            self.ctx, FakeNetwork, sorts=self.SORTS, limit=3,
+            marker_obj=marker_obj).all()
+        with mock.patch.object(self.session, 'get') as get:
+            actual = model_query.get_collection_query(
+                self.ctx, FakeNetwork, sorts=self.SORTS, limit=3,
+                marker_values=self._values(marker_obj)).all()
+        self.assertEqual(expected, actual)
+        get.assert_not_called()
+
+    def test_marker_values_missing_key(self):
+        self.assertRaises(n_exc.BadRequest,
+                          model_query.get_collection_query,
+                          self.ctx, FakeNetwork, sorts=self.SORTS, limit=2,
+                          marker_values={'project_id': 'other'})
+
+    def test_marker_values_invalid_cursor(self):
+        self.assertRaises(n_exc.BadRequest,
+                          model_query.get_collection_query,
+                          self.ctx, FakeNetwork, sorts=self.SORTS, limit=2,
+                          marker_values='not a cursor')
+
+    def test_get_collection_marker_values(self):
+        marker = {'project_id': 'other', 'id': 'shared_all'}
+        result = model_query.get_collection(
+            self.ctx, FakeNetwork, lambda row, fields: {'id': row.id},
+            sorts=self.SORTS, limit=2, marker_values=marker)
+        self.assertEqual(['shared_to_project', 'own'],
+                         [item['id'] for item in result])
+
+
+class TestIterCollection(ModelQueryDbTestCase):
+
+    SORTS = [('project_id', True)]
+
+    def setUp(self):
+        super().setUp()
+        self.scoped.return_value = False
+
+    @staticmethod
+    def _make_dict(network, fields=None):
+        return {'id': network.id, 'project_id': network.project_id,
+                'rbac_entries': len(network.rbac_entries)}
+
+    def test_iter_collection(self):
+        expected = model_query.get_collection(
+            self.ctx, FakeNetwork, self._make_dict, sorts=self.SORTS)
+        result = model_query.iter_collection(
+            self.ctx, FakeNetwork, self._make_dict, sorts=self.SORTS,
+            chunk_size=2)
+        self.assertIsInstance(result, types.GeneratorType)
+        # rbac_entries is subquery loaded, which yield_per doesn't support
+        self.assertEqual(expected, list(result))
+        self.assertEqual(2, expected[3]['rbac_entries'])
+        self.assertEqual('other', expected[0]['tenant_id'])
+
+    def test_iter_collection_incremental(self):
+        dict_func = mock.Mock(side_effect=self._make_dict)
+        result = model_query.iter_collection(
+            self.ctx, FakeNetwork, dict_func, sorts=self.SORTS, chunk_size=2)
+        self.assertEqual('external', next(result)['id'])
+        self.assertEqual(1, dict_func.call_count)
+        self.assertEqual(4, len(list(result)))
+
+    def test_iter_collection_lazy_fields(self):
+        result = model_query.iter_collection(
+            self.ctx, FakeNetwork, None, sorts=self.SORTS,
+            lazy_fields=[FakeNetwork.rbac_entries])
+        self.assertEqual(5, len(list(result)))
+        self.assertEqual(
+            [], model_query._get_streaming_options(
+                FakeNetwork, [FakeNetwork.rbac_entries]))
+
+    def test_iter_collection_scalar_subquery_load(self):
+        with self.session.begin():
+            self.session.add_all([
+                FakePort(id=f'port-{i}', network_id=network_id,
+                         mac_address=netaddr.EUI(f'fa:16:3e:00:00:{i:02x}'))
+                for i, network_id in enumerate(
+                    ('own', 'shared_to_project', 'own'))])
+        result = model_query.iter_collection(
+            self.ctx, FakePort,
+            lambda port, fields: {'id': port.id,
+                                  'rbac_entries': len(
+                                      port.network.rbac_entries)},
+            sorts=[('id', True)], chunk_size=2)
+        # network is subquery loaded, and so is its rbac_entries
+        self.assertEqual([{'id': 'port-0', 'rbac_entries': 0},
+                          {'id': 'port-1', 'rbac_entries': 2},
+                          {'id': 'port-2', 'rbac_entries': 0}],
+                         list(result))
+
+    def test_iter_collection_page_reverse(self):
+        kwargs = {'sorts': self.SORTS, 'limit': 2, 'page_reverse': True,
+                  'marker_values': {'project_id': 'other', 'id': 'other'}}
+        expected = model_query.get_collection(
+            self.ctx, FakeNetwork, self._make_dict, **kwargs)
+        result = model_query.iter_collection(
+            self.ctx, FakeNetwork, self._make_dict, **kwargs)
+        self.assertEqual(2, len(expected))
+        self.assertEqual(expected, list(result))
+
+
+class TestCollectionCount(ModelQueryDbTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.statements = []
+        engine = db_api.CONTEXT_WRITER.get_engine()
+
+        def _before_execute(conn, cursor, statement, *args):
+            self.statements.append(statement)
+
+        sa.event.listen(engine, 'before_cursor_execute', _before_execute)
+        self.addCleanup(sa.event.remove, engine, 'before_cursor_execute',
+                        _before_execute)
+
+    def _test_count(self, model, filters=None, query_field=None, ctx=None):
+        ctx = ctx or self.ctx
+        expected = model_query.get_collection_query(
+            ctx, model, filters=filters, field=query_field).count()
+        del self.statements[:]
+        count = model_query.get_collection_count(
+            ctx, model, filters=filters, query_field=query_field)
+        self.assertEqual(expected, count)
+        self.assertEqual(1, len(self.statements))
+        statement = self.statements[0]
+        self.assertNotIn('GROUP BY', statement)
+        self.assertNotIn('FROM (SELECT', statement)
+        return count
+
+    def test_count_rbac_join(self):
+        self.assertEqual(3, self._test_count(FakeNetwork))
+        self.assertIn('count(DISTINCT', self.statements[0])
+
+    def test_count_rbac_exists(self):
+        model_query.set_rbac_strategy(model_query.RBAC_STRATEGY_EXISTS)
+        self.assertEqual(3, self._test_count(FakeNetwork, query_field='id'))
+
+    def test_count_rbac_other_project(self):
+        ctx = context.Context('user', 'another')
+        self.assertEqual(2, self._test_count(FakeNetwork, ctx=ctx))
+
+    def test_count_query_field(self):
+        self.assertEqual(3, self._test_count(FakeNetwork, query_field='id'))
+
+    def test_count_filters(self):
+        self.assertEqual(
+            1, self._test_count(FakeNetwork, filters={'id': ['own', 'other']}))
+
+    def test_count_not_scoped(self):
+        self.scoped.return_value = False
+        self.assertEqual(5, self._test_count(FakeNetwork))
+
+    def test_count_project_scope(self):
+        self.assertEqual(1, self._test_count(FakeProjectModel))
+
+    def test_count_query_hook(self):
+        def _query_hook(ctx, model, query):
+            return query.order_by(model.id)
+
+        model_query.register_hook(FakeNetwork, 'hook', _query_hook, None,
+                                  None)
+        self.assertEqual(3, self._test_count(FakeNetwork))
+        self.assertNotIn('ORDER BY', self.statements[0])
+
+    def _test_count_subquery(self, query_hook):
+        model_query.register_hook(FakeNetwork, 'hook', query_hook, None,
+                                  None)
+        expected = model_query.get_collection_query(
+            self.ctx, FakeNetwork).count()
+        del self.statements[:]
+        self.assertEqual(expected, model_query.get_collection_count(
+            self.ctx, FakeNetwork))
+        self.assertIn('FROM (SELECT', self.statements[-1])
+        return expected
+
+    def test_count_query_hook_distinct(self):
+        def _query_hook(ctx, model, query):
+            rbac = orm.aliased(FakeRBAC)
+            return query.outerjoin(
+                rbac, rbac.object_id == model.id).distinct()
+
+        self.assertEqual(3, self._test_count_subquery(_query_hook))
+        self.scoped.return_value = False
+        self.assertEqual(5, self._test_count_subquery(_query_hook))
+
+    def test_count_query_hook_group_by(self):
+        def _query_hook(ctx, model, query):
+            rbac = orm.aliased(FakeRBAC)
+            return query.outerjoin(
+                rbac, rbac.object_id == model.id).group_by(model.id)
+
+        self.assertEqual(3, self._test_count_subquery(_query_hook))
+
+    def test_count_result_filter_distinct(self):
+        def _result_filter(query, filters):
+            rbac = orm.aliased(FakeRBAC)
+            return query.outerjoin(
+                rbac, rbac.object_id == FakeNetwork.id).distinct()
+
+        model_query.register_hook(FakeNetwork, 'hook', None, None,
+                                  _result_filter)
+        self.scoped.return_value = False
+        # the result filters only run with filters
+        self.assertEqual(2, model_query.get_collection_count(
+            self.ctx, FakeNetwork, filters={'id': ['own', 'shared_all']}))
+        self.assertIn('FROM (SELECT', self.statements[-1])
+
+    def test_is_distinct_or_grouped(self):
+        query = self.session.query(FakeNetwork)
+        self.assertFalse(model_query._is_distinct_or_grouped(query))
+        self.assertTrue(model_query._is_distinct_or_grouped(
+            query.distinct()))
+        self.assertTrue(model_query._is_distinct_or_grouped(
+            query.group_by(FakeNetwork.id)))
+        self.assertTrue(model_query._is_distinct_or_grouped(mock.Mock(
+            spec=[])))
@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from unittest import mock
+
 from oslotest import base
 
 from neutron_lib.db import resource_extend
@@ -27,12 +29,17 @@ class _DBExtender:
     def _extend_b(self, resp, db_obj):
         pass
 
+    @resource_extend.extends_batch('ExtendedC')
+    def _extend_c(self, items):
+        pass
+
 
 class TestResourceExtendClass(base.BaseTestCase):
 
     def test_extends(self):
         self.assertIsNotNone(resource_extend.get_funcs('ExtendedA'))
         self.assertIsNotNone(resource_extend.get_funcs('ExtendedB'))
+        self.assertIsNotNone(resource_extend.get_funcs('ExtendedC'))
 
 
 class TestResourceExtend(base.BaseTestCase):
@@ -76,3 +83,117 @@ class TestResourceExtend(base.BaseTestCase):
             resource_extend.apply_funcs(r, None, None)
 
         self.assertEqual(3, len(callbacks))
+
+    def test_apply_funcs_batch_func(self):
+        calls = []
+
+        @resource_extend.extends_batch(['A'])
+        def _cb(items):
+            calls.append(items)
+
+        resource_extend.register_funcs('A', (_cb,))
+        resource_extend.apply_funcs('A', 'resp', 'db_obj')
+
+        self.assertEqual([[('resp', 'db_obj')]], calls)
+
+    def test_apply_funcs_batch(self):
+        calls = []
+
+        def _cb(resp, db_obj):
+            calls.append(('legacy', resp, db_obj))
+
+        @resource_extend.extends_batch(['A'])
+        def _batch_cb(items):
+            calls.append(('batch', items))
+
+        resource_extend.register_funcs('A', (_cb, _batch_cb))
+        items = [('resp1', 'db_obj1'), ('resp2', 'db_obj2')]
+        resource_extend.apply_funcs_batch('A', iter(items))
+
+        self.assertEqual([('legacy', 'resp1', 'db_obj1'),
+                          ('legacy', 'resp2', 'db_obj2'),
+                          ('batch', items)], calls)
+
+    def test_apply_funcs_batch_empty(self):
+        batch_cb = mock.Mock()
+        setattr(batch_cb, resource_extend._EXTENDS_BATCH, True)
+        resource_extend.register_funcs('A', (batch_cb,))
+
+        resource_extend.apply_funcs_batch('A', [])
+
+        batch_cb.assert_not_called()
+
+
+def _extend_a(resp, db_obj):
+    resp['a'] = db_obj
+
+
+@resource_extend.extends_batch(['A'])
+def _extend_a_batch(items):
+    for resp, db_obj in items:
+        resp['batch'] = db_obj
+
+
+class TestResourceExtendExtenders(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.useFixture(fixture.DBResourceExtendFixture())
+        self.addCleanup(resource_extend.disable_stats)
+
+    def test_extenders_cached(self):
+        resource_extend.register_funcs('A', (_extend_a,))
+        extenders = resource_extend._get_extenders('A')
+        self.assertIs(extenders, resource_extend._get_extenders('A'))
+        self.assertEqual([__name__ + '._extend_a'],
+                         [e.name for e in extenders])
+
+    def test_extenders_invalidated_on_register(self):
+        resource_extend.register_funcs('A', (_extend_a,))
+        resource_extend._get_extenders('A')
+        resource_extend.register_funcs('A', (_extend_a_batch,))
+        extenders = resource_extend._get_extenders('A')
+        self.assertEqual([False, True], [e.batch for e in extenders])
+
+    def test_extenders_invalidated_by_fixture(self):
+        resource_extend.register_funcs('A', (_extend_a,))
+        resource_extend._get_extenders('A')
+        self.useFixture(fixture.DBResourceExtendFixture())
+        self.assertEqual((), resource_extend._get_extenders('A'))
+
+    def test_apply_funcs_dead_ref(self):
+        class _Extender:
+            def extend(self, resp, db_obj):
+                resp['dead'] = True
+
+        extender = _Extender()
+        resource_extend.register_funcs('A', (extender.extend, _extend_a))
+        self.assertEqual(2, len(resource_extend._get_extenders('A')))
+        del extender
+        resp = {}
+        resource_extend.apply_funcs('A', resp, 'db_obj')
+        self.assertEqual({'a': 'db_obj'}, resp)
+
+    def test_stats_disabled(self):
+        resource_extend.register_funcs('A', (_extend_a,))
+        resource_extend.apply_funcs('A', {}, None)
+        self.assertEqual({}, resource_extend.get_stats())
+
+    def test_stats(self):
+        resource_extend.enable_stats()
+        resource_extend.register_funcs('A', (_extend_a, _extend_a_batch))
+        resource_extend.apply_funcs('A', {}, None)
+        resource_extend.apply_funcs_batch('A', [({}, None), ({}, None)])
+
+        stats = resource_extend.get_stats()
+        self.assertEqual(['A'], list(stats))
+        # One sample per call of _extend_a, one per list of _extend_a_batch
+        self.assertEqual({__name__ + '._extend_a': 3,
+                          __name__ + '._extend_a_batch': 2},
+                         {name: record['count']
+                          for name, record in stats['A'].items()})
+        for record in stats['A'].values():
+            self.assertGreaterEqual(record['total_time'], 0)
+
+        resource_extend.disable_stats()
+        self.assertEqual({}, resource_extend.get_stats())
@@ -241,6 +241,170 @@ class MACAddressTestCase(SqlAlchemyTypesBaseTestCase):
                               id=uuidutils.generate_uuid(), mac=mac)
 
 
+class LazyIPAddressTestCase(IPAddressTestCase):
+
+    def _get_test_table(self, meta):
+        return sa.Table(
+            'fakelazyipaddressmodels',
+            meta,
+            sa.Column('id', sa.String(36), primary_key=True, nullable=False),
+            sa.Column('ip', sqlalchemytypes.IPAddress(lazy=True)))
+
+    def test_lazy_values(self):
+        self._add_row(id='fake_id', ip=netaddr.IPAddress('10.0.0.1'))
+        ip = self._get_all()[0].ip
+        self.assertIsInstance(ip, sqlalchemytypes.LazyIPAddress)
+        self._update_row(ip=ip)
+        self.assertEqual('10.0.0.1', str(self._get_all()[0].ip))
+
+
+class LazyCIDRTestCase(CIDRTestCase):
+
+    def _get_test_table(self, meta):
+        return sa.Table(
+            'fakelazycidrmodels',
+            meta,
+            sa.Column('id', sa.String(36), primary_key=True, nullable=False),
+            sa.Column('cidr', sqlalchemytypes.CIDR(lazy=True))
+        )
+
+
+class LazyMACAddressTestCase(MACAddressTestCase):
+
+    def _get_test_table(self, meta):
+        return sa.Table(
+            'fakelazymacaddressmodels',
+            meta,
+            sa.Column('id', sa.String(36), primary_key=True, nullable=False),
+            sa.Column('mac', sqlalchemytypes.MACAddress(lazy=True))
+        )
+
+
+class LazyNetaddrTestCase(test_base.BaseTestCase):
+
+    VALUES = (
+        (sqlalchemytypes.LazyIPAddress,
+         ['10.0.0.1', '255.255.255.255', '::', '2001:db8::1',
+          '::ffff:10.0.0.1', '2210::ffff:ffff:ffff:ffff']),
+        (sqlalchemytypes.LazyIPNetwork,
+         ['10.0.0.0/24', '10.0.0.1/24', '2001:db8::/42',
+          'fe80::21e:67ff:fed0:56f0/64', '0.0.0.0/0']),
+        (sqlalchemytypes.LazyEUI,
+         ['FA-16-3E-00-00-01', '00-00-00-00-00-00']),
+    )
+
+    def test_same_as_netaddr(self):
+        for lazy_type, values in self.VALUES:
+            for value in values:
+                obj = lazy_type.netaddr_type(value)
+                lazy = lazy_type(str(obj))
+                self.assertEqual(str(obj), str(lazy))
+                self.assertEqual(obj, lazy)
+                self.assertEqual(lazy, obj)
+                self.assertEqual(hash(obj), hash(lazy))
+                self.assertEqual(obj.value, lazy.value)
+
+    def test_not_parsed(self):
+        lazy = sqlalchemytypes.LazyIPAddress('10.0.0.1')
+        self.assertEqual("LazyIPAddress('10.0.0.1')", repr(lazy))
+        self.assertEqual('10.0.0.1', str(lazy))
+        self.assertIsNone(lazy._obj)
+        self.assertIs(lazy.to_netaddr(), lazy.to_netaddr())
+
+    def test_operations(self):
+        ip = sqlalchemytypes.LazyIPAddress('10.0.0.1')
+        ip2 = sqlalchemytypes.LazyIPAddress('10.0.0.2')
+        net = sqlalchemytypes.LazyIPNetwork('10.0.0.0/30')
+        self.assertLess(ip, ip2)
+        self.assertGreater(ip2, netaddr.IPAddress('10.0.0.1'))
+        self.assertEqual(167772161, int(ip))
+        self.assertIn(ip, net)
+        self.assertIn(netaddr.IPAddress('10.0.0.2'), net)
+        self.assertEqual(4, len(net))
+        self.assertEqual([netaddr.IPAddress('10.0.0.%d' % i)
+                          for i in range(4)], list(net))
+        self.assertEqual(1, len({ip, netaddr.IPAddress('10.0.0.1')}))
+        self.assertRaises(AttributeError, getattr, ip, '_value')
+
+    def test_null(self):
+        self.assertIsNone(sqlalchemytypes.IPAddress(
+            lazy=True).process_result_value(None, None))
+
+
+class PackedIPAddressTestCase(IPAddressTestCase):
+
+    def _get_test_table(self, meta):
+        return sa.Table(
+            'fakepackedipaddressmodels',
+            meta,
+            sa.Column('id', sa.String(36), primary_key=True, nullable=False),
+            sa.Column('ip', sqlalchemytypes.PackedIPAddress, index=True))
+
+    def test_range(self):
+        for i, ip in enumerate(['10.0.0.1', '10.0.1.255', '10.0.2.0',
+                                '9.255.255.255', '10.0.1.0']):
+            self._add_row(id=f'fake_id{i}', ip=netaddr.IPAddress(ip))
+        network = netaddr.IPNetwork('10.0.0.0/23')
+        query = sa.select(self.test_table.c.ip).where(
+            self.test_table.c.ip.between(netaddr.IPAddress(network.first),
+                                         netaddr.IPAddress(network.last))
+        ).order_by(self.test_table.c.ip)
+        with self.engine.connect() as conn:
+            ips = conn.execute(query).scalars().all()
+        self.assertEqual([netaddr.IPAddress('10.0.0.1'),
+                          netaddr.IPAddress('10.0.1.0'),
+                          netaddr.IPAddress('10.0.1.255')], ips)
+
+    def test_lazy_value(self):
+        self._add_row(id='fake_id',
+                      ip=sqlalchemytypes.LazyIPAddress('2001:db8::1'))
+        self.assertEqual(netaddr.IPAddress('2001:db8::1'),
+                         self._get_all()[0].ip)
+
+
+class PackedCIDRTestCase(CIDRTestCase):
+
+    def _get_test_table(self, meta):
+        return sa.Table(
+            'fakepackedcidrmodels',
+            meta,
+            sa.Column('id', sa.String(36), primary_key=True, nullable=False),
+            sa.Column('cidr', sqlalchemytypes.PackedCIDR)
+        )
+
+    def test_host_bits_kept(self):
+        cidr = netaddr.IPNetwork('10.0.0.5/24')
+        self._add_row(id='fake_id', cidr=cidr)
+        cidr = self._get_one(cidr).cidr
+        self.assertEqual('10.0.0.5/24', str(cidr))
+        self.assertEqual(4, cidr.version)
+
+
+class PackedMACAddressTestCase(MACAddressTestCase):
+
+    def _get_test_table(self, meta):
+        return sa.Table(
+            'fakepackedmacaddressmodels',
+            meta,
+            sa.Column('id', sa.String(36), primary_key=True, nullable=False),
+            sa.Column('mac', sqlalchemytypes.PackedMACAddress)
+        )
+
+    def test_wrong_mac(self):
+        super().test_wrong_mac()
+        self.assertRaises(exception.DBError, self._add_row,
+                          id=uuidutils.generate_uuid(),
+                          mac=netaddr.EUI('fa:16:3e:ff:fe:00:00:01'))
+
+    def test_stored_bytes(self):
+        self._add_row(id='fake_id', mac=netaddr.EUI('fa:16:3e:00:00:01'))
+        query = sa.select(sa.type_coerce(self.test_table.c.mac,
+                                         sa.LargeBinary))
+        with self.engine.connect() as conn:
+            self.assertEqual(b'\xfa\x16\x3e\x00\x00\x01',
+                             conn.execute(query).scalar())
+
+
 class TruncatedDateTimeTestCase(SqlAlchemyTypesBaseTestCase):
 
     def _get_test_table(self, meta):
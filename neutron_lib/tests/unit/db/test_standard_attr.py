@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import gc
+import operator
 
 from sqlalchemy import orm
 import testtools
@@ -105,3 +106,41 @@ class StandardAttrTestCase(base.BaseTestCase):
 
         with testtools.ExpectedException(RuntimeError):
             standard_attr.get_tag_resource_parent_map()
+
+    def test_standard_attr_maps_cached(self):
+        rs_map = standard_attr.get_standard_attr_resource_model_map()
+        parent_map = standard_attr.get_tag_resource_parent_map()
+        self.assertIs(rs_map,
+                      standard_attr.get_standard_attr_resource_model_map())
+        self.assertIs(parent_map, standard_attr.get_tag_resource_parent_map())
+        self.assertRaises(TypeError, operator.setitem, rs_map, 'foo', None)
+        self.assertRaises(TypeError, operator.setitem, parent_map, 'foo',
+                          'bar')
+
+    def test_standard_attr_maps_invalidated(self):
+        rs_map = standard_attr.get_standard_attr_resource_model_map()
+        parent_map = standard_attr.get_tag_resource_parent_map()
+        decl_base = self._make_decl_base()
+
+        class CachedModel(standard_attr.HasStandardAttributes,
+                          standard_attr.model_base.HasId,
+                          decl_base):
+            api_collections = ['cached_resource']
+            collection_resource_map = {'cached_resources': 'cached'}
+            tag_support = True
+
+        new_rs_map = standard_attr.get_standard_attr_resource_model_map()
+        self.assertIsNot(rs_map, new_rs_map)
+        self.assertIs(CachedModel, new_rs_map['cached_resource'])
+        self.assertEqual(
+            'cached',
+            standard_attr.get_tag_resource_parent_map()['cached_resources'])
+        self.assertNotIn('cached_resources', parent_map)
+
+        del CachedModel, decl_base
+        gc.collect()
+        self.assertNotIn(
+            'cached_resource',
+            standard_attr.get_standard_attr_resource_model_map())
+        self.assertNotIn('cached_resources',
+                         standard_attr.get_tag_resource_parent_map())
@@ -10,8 +10,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
 from unittest import mock
 
+import netaddr
 from oslo_config import cfg
 from oslo_db.sqlalchemy import models
 import sqlalchemy as sa
@@ -254,6 +256,30 @@ class TestSafeCreation(base.BaseTestCase):
         self.assertEqual('value', value)
 
 
+class TestPaginationCursor(base.BaseTestCase):
+
+    def test_round_trip(self):
+        values = {'id': 'id-1', 'mtu': 1500, 'shared': False,
+                  'description': None,
+                  'created_at': datetime.datetime(2020, 1, 2, 3, 4, 5, 6)}
+        cursor = utils.encode_pagination_cursor(values)
+        self.assertIsInstance(cursor, str)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(values, utils.decode_pagination_cursor(cursor))
+
+    def test_round_trip_stringified_value(self):
+        values = {'mac_address': netaddr.EUI('fa:16:3e:00:00:01')}
+        cursor = utils.encode_pagination_cursor(values)
+        self.assertEqual({'mac_address': 'FA-16-3E-00-00-01'},
+                         utils.decode_pagination_cursor(cursor))
+
+    def test_decode_invalid(self):
+        # not base64, not JSON, not a JSON object ('[1]')
+        for cursor in ('not a cursor', 'bm90IGpzb24', 'WzFd'):
+            self.assertRaises(n_exc.BadRequest,
+                              utils.decode_pagination_cursor, cursor)
+
+
 class TestUtilsWithScopeEnforcement(TestUtilsLegacyPolicies):
 
     def setUp(self):
@@ -53,6 +53,15 @@ class CallbackRegistryFixtureTestCase(base.BaseTestCase):
         registry.publish('a', 'b', self, payload=mock.ANY)
         self.assertTrue(self.manager.publish.called)
 
+    def test_fixture_own_manager_cleared(self):
+        registry_fixture = fixture.CallbackRegistryFixture()
+        with mock.patch.object(registry_fixture.callback_manager,
+                               'clear') as clear:
+            registry_fixture.setUp()
+            registry_fixture.cleanUp()
+        clear.assert_called_once_with()
+        self.assertFalse(self.manager.clear.called)
+
 
 class SqlFixtureTestCase(base.BaseTestCase):
 
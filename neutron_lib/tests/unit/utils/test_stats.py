@@ -0,0 +1,58 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from neutron_lib.tests import _base as base
+from neutron_lib.utils import stats
+
+
+class TestLatencyStats(base.BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.stats = stats.LatencyStats(buckets=(0.1, 0.01, 1))
+
+    def test_buckets_sorted(self):
+        self.assertEqual((0.01, 0.1, 1), self.stats.buckets)
+
+    def test_record(self):
+        self.stats.record('key', 'name', 0.005)
+        self.stats.record('key', 'name', 0.05)
+        self.stats.record('key', 'name', 3)
+        self.stats.record('key', 'other', 0.5)
+        snapshot = self.stats.snapshot()
+        self.assertEqual({'key'}, set(snapshot))
+        record = snapshot['key']['name']
+        self.assertEqual(3, record['count'])
+        self.assertAlmostEqual(3.055, record['total_time'])
+        self.assertEqual([(0.01, 1), (0.1, 1), (1, 0), (float('inf'), 1)],
+                         record['histogram'])
+        self.assertEqual(1, snapshot['key']['other']['count'])
+
+    def test_snapshot_is_a_copy(self):
+        self.stats.record('key', 'name', 0.005)
+        snapshot = self.stats.snapshot()
+        self.stats.record('key', 'name', 0.005)
+        self.assertEqual(1, snapshot['key']['name']['count'])
+
+    def test_top(self):
+        self.stats.record('k1', 'fast', 0.1)
+        self.stats.record('k2', 'slow', 0.5)
+        self.stats.record('k2', 'slow', 0.5)
+        self.assertEqual([('k2', 'slow', 2, 1.0), ('k1', 'fast', 1, 0.1)],
+                         self.stats.top())
+        self.assertEqual([('k2', 'slow', 2, 1.0)], self.stats.top(limit=1))
+
+    def test_reset(self):
+        self.stats.record('key', 'name', 0.005)
+        self.stats.reset()
+        self.assertEqual({}, self.stats.snapshot())
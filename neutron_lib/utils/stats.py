@@ -0,0 +1,90 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import threading
+
+
+# Upper bounds, in seconds, of the latency histogram buckets. An implicit
+# last bucket collects the samples above the highest bound.
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class LatencyStats:
+    """Thread safe call count, cumulative time and latency histogram.
+
+    Samples are recorded per ``(key, name)``, where ``key`` groups related
+    samples (for instance a resource and an event) and ``name`` identifies
+    what was measured (for instance a callback).
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self._buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._records = {}
+
+    @property
+    def buckets(self):
+        return self._buckets
+
+    def record(self, key, name, duration):
+        """Record a sample.
+
+        :param key: the group the sample belongs to.
+        :param name: the name of the measured item within the group.
+        :param duration: the duration of the sample, in seconds.
+        """
+        index = bisect.bisect_left(self._buckets, duration)
+        with self._lock:
+            group = self._records.setdefault(key, {})
+            record = group.get(name)
+            if record is None:
+                record = group[name] = [0, 0.0, [0] * (len(self._buckets) + 1)]
+            record[0] += 1
+            record[1] += duration
+            record[2][index] += 1
+
+    def snapshot(self):
+        """Return a copy of the recorded samples.
+
+        :returns: a dict ``{key: {name: {'count': int, 'total_time': float,
+            'histogram': [(upper_bound, count), ...]}}}``; the upper bound of
+            the last histogram bucket is ``float('inf')``.
+        """
+        bounds = self._buckets + (float('inf'),)
+        with self._lock:
+            return {
+                key: {name: {'count': count,
+                             'total_time': total_time,
+                             'histogram': list(zip(bounds, histogram))}
+                      for name, (count, total_time, histogram)
+                      in group.items()}
+                for key, group in self._records.items()}
+
+    def top(self, limit=None):
+        """Return the recorded items sorted by decreasing cumulative time.
+
+        :param limit: the maximum number of items to return, or None for all.
+        :returns: a list of ``(key, name, count, total_time)`` tuples.
+        """
+        with self._lock:
+            items = [(key, name, record[0], record[1])
+                     for key, group in self._records.items()
+                     for name, record in group.items()]
+        items.sort(key=lambda item: item[3], reverse=True)
+        return items[:limit] if limit is not None else items
+
+    def reset(self):
+        """Drop all the recorded samples."""
+        with self._lock:
+            self._records = {}